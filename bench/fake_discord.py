@@ -0,0 +1,69 @@
+"""Recording fake of the Discord objects the bot writes to
+
+Channels and messages expose the coroutine methods the bot calls (send,
+edit and delete). Each call is counted and timed by a shared recorder,
+with an optional simulated round trip.
+"""
+
+import asyncio
+import itertools
+import time
+
+
+class CallRecorder:
+    def __init__(self, latency=0.0):
+        self.latency = latency  # Simulated Discord round trip, in seconds
+        self.counts = {}
+        self.latencies = []
+        self.ids = itertools.count(1000)
+
+    async def record(self, kind):
+        started = time.perf_counter()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        self.latencies.append(time.perf_counter() - started)
+
+    def total(self):
+        return sum(self.counts.values())
+
+    def reset(self):
+        self.counts = {}
+        self.latencies = []
+
+
+class FakeMessage:
+    def __init__(self, channel, embed=None, content=None):
+        self.channel = channel
+        self.id = next(channel.recorder.ids)
+        self.embed = embed
+        self.content = content
+        self.pinned = False
+
+    @property
+    def embeds(self):
+        return [self.embed] if self.embed else []
+
+    async def edit(self, embed=None, content=None, **kwargs):
+        await self.channel.recorder.record('edit')
+        self.embed = embed or self.embed
+        self.content = content or self.content
+        return self
+
+    async def delete(self):
+        await self.channel.recorder.record('delete')
+        self.channel.messages.pop(self.id, None)
+
+
+class FakeChannel:
+    def __init__(self, recorder, channel_id=1, name='downloads'):
+        self.recorder = recorder
+        self.id = channel_id
+        self.name = name
+        self.messages = {}
+
+    async def send(self, content=None, embed=None, **kwargs):
+        await self.recorder.record('send')
+        message = FakeMessage(self, embed=embed, content=content)
+        self.messages[message.id] = message
+        return message
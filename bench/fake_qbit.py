@@ -0,0 +1,207 @@
+"""Stand-in qBittorrent WebUI for benchmarks
+
+Serves a synthetic torrent library over the parts of the WebUI API the bot
+uses (login, torrents/info, sync/maindata) and lets the runner apply churn
+between refreshes. Field-level change tracking makes sync/maindata deltas
+look like the real thing: only fields that changed since the caller's rid.
+"""
+
+import json
+import random
+import string
+
+from aiohttp import web
+
+CATEGORIES = ['radarr', 'tv-sonarr', 'music', '']
+SEEDING_STATES = ['uploading', 'stalledUP', 'pausedUP', 'queuedUP', 'forcedUP']
+DOWNLOADING_STATES = ['downloading', 'stalledDL', 'metaDL', 'queuedDL', 'pausedDL']
+
+# Which of our status filters qBittorrent's own filters accept
+COMPLETED_STATES = set(SEEDING_STATES) | {'checkingUP'}
+
+
+class FakeQbitServer:
+    def __init__(self, torrent_count, seed=0, downloading_ratio=0.02):
+        self.rng = random.Random(seed)
+        self.rid = 1  # Like qBittorrent, response IDs start at 1
+        self.torrents = {}  # hash -> torrent dict
+        self.changed = {}  # hash -> {field: rid it last changed at}
+        self.added_at = {}  # hash -> rid
+        self.removed = {}  # hash -> rid it was removed at
+        self.bytes_sent = 0
+        self.requests = 0
+        self.runner = None
+        self.port = None
+
+        for _ in range(torrent_count):
+            self._add(downloading=self.rng.random() < downloading_ratio)
+
+    # Library generation and churn
+
+    def _new_hash(self):
+        return ''.join(self.rng.choice('0123456789abcdef') for _ in range(40))
+
+    def _new_name(self):
+        words = [''.join(self.rng.choice(string.ascii_lowercase) for _ in range(self.rng.randint(3, 9)))
+                 for _ in range(self.rng.randint(3, 8))]
+        return '.'.join(words).title() + self.rng.choice(['.1080p.mkv', '.S01.COMPLETE', '.2160p', '.FLAC'])
+
+    def _add(self, downloading=True):
+        torrent_hash = self._new_hash()
+        size = self.rng.randint(50 * 2**20, 80 * 2**30)
+        if downloading:
+            progress = round(self.rng.random(), 4)
+            state = self.rng.choice(DOWNLOADING_STATES)
+            dlspeed = self.rng.randint(0, 20 * 2**20) if state == 'downloading' else 0
+        else:
+            progress = 1.0
+            state = self.rng.choice(SEEDING_STATES)
+            dlspeed = 0
+        torrent = {
+            'hash': torrent_hash,
+            'name': self._new_name(),
+            'category': self.rng.choice(CATEGORIES),
+            'progress': progress,
+            'state': state,
+            'eta': 8640000 if not dlspeed else int(size * (1 - progress) / dlspeed),
+            'size': size,
+            'dlspeed': dlspeed,
+            # Ballast the real API sends and the bot should ignore
+            'upspeed': self.rng.randint(0, 2**20),
+            'ratio': round(self.rng.random() * 3, 3),
+            'tracker': 'https://tracker.example.org/announce',
+            'save_path': '/data/torrents/',
+            'added_on': 1700000000 + self.rng.randint(0, 10**7),
+            'num_seeds': self.rng.randint(0, 200),
+            'num_leechs': self.rng.randint(0, 50),
+        }
+        self.torrents[torrent_hash] = torrent
+        self.added_at[torrent_hash] = self.rid
+        self.changed[torrent_hash] = {field: self.rid for field in torrent}
+        return torrent_hash
+
+    def _set(self, torrent_hash, **fields):
+        torrent = self.torrents[torrent_hash]
+        for field, value in fields.items():
+            if torrent.get(field) != value:
+                torrent[field] = value
+                self.changed[torrent_hash][field] = self.rid
+
+    def churn(self, updates=50, adds=1, removes=1):
+        """Advance the library by one step of activity"""
+        self.rid += 1
+        downloading = [h for h, t in self.torrents.items() if t['progress'] < 1]
+        others = list(self.torrents)
+
+        for torrent_hash in self.rng.sample(downloading, min(updates, len(downloading))):
+            torrent = self.torrents[torrent_hash]
+            progress = min(1.0, round(torrent['progress'] + self.rng.random() * 0.1, 4))
+            if progress >= 1.0:
+                self._set(torrent_hash, progress=1.0, state='uploading', dlspeed=0, eta=8640000)
+            else:
+                dlspeed = self.rng.randint(0, 20 * 2**20)
+                self._set(torrent_hash, progress=progress, state='downloading' if dlspeed else 'stalledDL',
+                          dlspeed=dlspeed,
+                          eta=8640000 if not dlspeed else int(torrent['size'] * (1 - progress) / dlspeed))
+
+        # Seeders tick their upload counters too
+        for torrent_hash in self.rng.sample(others, min(updates, len(others))):
+            self._set(torrent_hash, upspeed=self.rng.randint(0, 2**20))
+
+        for _ in range(adds):
+            self._add(downloading=True)
+        for torrent_hash in self.rng.sample(others, min(removes, len(others))):
+            del self.torrents[torrent_hash]
+            del self.changed[torrent_hash]
+            self.added_at.pop(torrent_hash, None)
+            self.removed[torrent_hash] = self.rid
+
+    # WebUI endpoints
+
+    async def _params(self, request):
+        params = dict(request.query)
+        if request.method == 'POST':
+            params.update(await request.post())
+        return params
+
+    def _json(self, payload):
+        body = json.dumps(payload, separators=(',', ':'))
+        self.bytes_sent += len(body)
+        return web.Response(text=body, content_type='application/json')
+
+    async def login(self, request):
+        self.requests += 1
+        response = web.Response(text='Ok.')
+        response.set_cookie('SID', 'bench')
+        return response
+
+    async def version(self, request):
+        self.requests += 1
+        return web.Response(text='v4.6.4')
+
+    async def webapi_version(self, request):
+        self.requests += 1
+        return web.Response(text='2.9.3')
+
+    async def torrents_info(self, request):
+        self.requests += 1
+        params = await self._params(request)
+        torrents = self.torrents.values()
+        if params.get('category') is not None:
+            torrents = [t for t in torrents if t['category'] == params['category']]
+        if params.get('filter') == 'completed':
+            torrents = [t for t in torrents if t['state'] in COMPLETED_STATES]
+        elif params.get('filter') == 'downloading':
+            torrents = [t for t in torrents if t['state'] in DOWNLOADING_STATES]
+        if params.get('hashes'):
+            wanted = set(params['hashes'].split('|'))
+            torrents = [t for t in torrents if t['hash'] in wanted]
+        return self._json(list(torrents))
+
+    async def sync_maindata(self, request):
+        self.requests += 1
+        since = int((await self._params(request)).get('rid', 0))
+        server_state = {
+            'dl_info_speed': sum(t['dlspeed'] for t in self.torrents.values()),
+            'up_info_speed': sum(t['upspeed'] for t in self.torrents.values()),
+        }
+        if since <= 0 or since > self.rid:
+            return self._json({
+                'rid': self.rid,
+                'full_update': True,
+                'torrents': {h: dict(t) for h, t in self.torrents.items()},
+                'server_state': server_state,
+            })
+
+        torrents = {}
+        for torrent_hash, fields in self.changed.items():
+            if self.added_at.get(torrent_hash, -1) > since:
+                torrents[torrent_hash] = dict(self.torrents[torrent_hash])
+                continue
+            changes = {f: self.torrents[torrent_hash][f] for f, rid in fields.items() if rid > since}
+            if changes:
+                torrents[torrent_hash] = changes
+        return self._json({
+            'rid': self.rid,
+            'torrents': torrents,
+            'torrents_removed': [h for h, rid in self.removed.items() if rid > since],
+            'server_state': server_state,
+        })
+
+    async def start(self, host='127.0.0.1', port=0):
+        app = web.Application()
+        app.router.add_route('*', '/api/v2/auth/login', self.login)
+        app.router.add_route('*', '/api/v2/app/version', self.version)
+        app.router.add_route('*', '/api/v2/app/webapiVersion', self.webapi_version)
+        app.router.add_route('*', '/api/v2/torrents/info', self.torrents_info)
+        app.router.add_route('*', '/api/v2/sync/maindata', self.sync_maindata)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
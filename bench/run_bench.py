@@ -0,0 +1,150 @@
+"""Benchmark the status refresh path against a fake WebUI and a fake Discord
+
+    python bench/run_bench.py --sizes 100,10000,50000 --cycles 20
+
+For each library size this starts a FakeQbitServer, points a real DiscordBot
+at it, and runs refresh cycles (churn, fetch, filter, render, update) against
+a recording FakeChannel. It reports per-phase latency percentiles, bytes
+pulled from the WebUI and Discord API calls per cycle. The first (cold)
+cycle is reported separately from the steady state.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from fake_discord import CallRecorder, FakeChannel
+from fake_qbit import FakeQbitServer
+
+PHASES = ('fetch', 'filter', 'render', 'update', 'total')
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def make_bot(port, pace):
+    # Point a stock bot at the fake server, with every optional feature off
+    os.environ.update({
+        'BOT_CHANNEL': '1',
+        'QBIT_INSTANCES': '',
+        'QBIT_HOST': '127.0.0.1',
+        'QBIT_PORT': str(port),
+        'QBIT_USERNAME': 'bench',
+        'QBIT_PASSWORD': 'bench',
+        'NOTIFY_CHANNELS': '',
+        'STATS_DB': '',
+        'STATE_FILE': '',
+    })
+    import qbit_bot
+
+    bot = qbit_bot.DiscordBot()
+    if not pace:
+        # Measure our own cost, not Discord's rate limits
+        bot.outbox.LIMITS = {kind: (10**9, 1.0) for kind in bot.outbox.LIMITS}
+    return qbit_bot, bot
+
+
+async def run_size(size, args):
+    server = FakeQbitServer(size, seed=args.seed)
+    port = await server.start()
+    qbit_bot, bot = make_bot(port, args.pace)
+    recorder = CallRecorder(latency=args.latency)
+    channel = FakeChannel(recorder)
+    view = qbit_bot.StatusView(channel, args.category, args.status)
+    bot.status_views[view.key] = view
+    key = view.filter_key
+
+    cycles = []
+    try:
+        await bot.torrent_manager.login()
+        for cycle in range(args.cycles + 1):
+            if cycle:
+                server.churn(updates=args.churn, adds=args.adds, removes=args.removes)
+            bytes_before = server.bytes_sent
+            recorder.reset()
+
+            started = time.perf_counter()
+            snapshots = await bot.torrent_manager.get_snapshots({key})
+            fetched = time.perf_counter()
+            view.rows = bot._filter_torrents(snapshots[key], *key)
+            filtered_at = time.perf_counter()
+            embed, digest, controls = bot._render_status(view)
+            rendered = time.perf_counter()
+            await bot._sync_status_message(view, embed, digest, controls)
+            updated = time.perf_counter()
+
+            cycles.append({
+                'fetch': fetched - started,
+                'filter': filtered_at - fetched,
+                'render': rendered - filtered_at,
+                'update': updated - rendered,
+                'total': updated - started,
+                'bytes': server.bytes_sent - bytes_before,
+                'calls': recorder.total(),
+                'call_latencies': list(recorder.latencies),
+                'rows': len(view.rows),
+                'pages': view.pages,
+            })
+    finally:
+        await bot.close()
+        await server.stop()
+    return cycles
+
+
+def report(size, cycles, out):
+    cold, steady = cycles[0], cycles[1:] or cycles[:1]
+    out(f"\n=== {size} torrents ({len(steady)} steady cycles) ===")
+    out(f"rows matched: {steady[-1]['rows']}, pages: {steady[-1]['pages']}")
+    out(f"{'phase':<8} {'cold ms':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for phase in PHASES:
+        values = [c[phase] * 1000 for c in steady]
+        out(f"{phase:<8} {cold[phase] * 1000:>10.2f} {percentile(values, 50):>10.2f} "
+            f"{percentile(values, 95):>10.2f} {percentile(values, 99):>10.2f}")
+    out(f"webui bytes: cold {cold['bytes']}, steady mean {sum(c['bytes'] for c in steady) / len(steady):.0f}")
+    out(f"discord calls: cold {cold['calls']}, steady mean {sum(c['calls'] for c in steady) / len(steady):.2f}")
+    latencies = [l * 1000 for c in steady for l in c['call_latencies']]
+    if latencies:
+        out(f"discord call ms: p50 {percentile(latencies, 50):.2f}, p95 {percentile(latencies, 95):.2f}, "
+            f"p99 {percentile(latencies, 99):.2f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='100,10000,50000', help="comma-separated library sizes")
+    parser.add_argument('--cycles', type=int, default=20, help="steady-state refresh cycles per size")
+    parser.add_argument('--churn', type=int, default=50, help="torrents updated per cycle")
+    parser.add_argument('--adds', type=int, default=1, help="torrents added per cycle")
+    parser.add_argument('--removes', type=int, default=1, help="torrents removed per cycle")
+    parser.add_argument('--category', default='all', help="status view category filter")
+    parser.add_argument('--status', default='all', help="status view status filter")
+    parser.add_argument('--latency', type=float, default=0.0, help="simulated Discord round trip, seconds")
+    parser.add_argument('--pace', action='store_true', help="keep the outbox's Discord rate limits")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="also write the report to this file")
+    args = parser.parse_args()
+
+    lines = []
+
+    def out(line):
+        print(line)
+        lines.append(line)
+
+    for size in (int(s) for s in args.sizes.split(',')):
+        report(size, await run_size(size, args), out)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -8,25 +8,221 @@
 ## py -3 -m pip install -U qbittorrent-api
 
 import discord
+from discord import app_commands
 from discord.ext import commands
+from aiohttp import web
 import requests
 import qbittorrentapi
 import os
 from dotenv import load_dotenv
 import logging
-from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from datetime import datetime, timedelta
 import asyncio
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import hashlib
+import hmac
+import heapq
+import json
+import queue
+import re
+import sys
+import sqlite3
+import time
+from operator import attrgetter
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('bot.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
+# Multi-line console banners, only emitted with LOG_BANNERS and never written to the log file
+banner_logger = logging.getLogger(f"{__name__}.banner")
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with any `extra` fields the call passed"""
+    RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in self.RESERVED)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class SampleFilter(logging.Filter):
+    """Lets through at most `burst` records per `window` seconds for each sample key
+
+    Records opt in with `extra={'sample': key}`. The first record let through
+    in a new window carries how many were dropped in the last one.
+    """
+
+    def __init__(self, window, burst):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.windows = {}  # sample key -> [window start, records seen, records dropped]
+
+    def filter(self, record):
+        key = getattr(record, 'sample', None)
+        if key is None:
+            return True
+        state = self.windows.get(key)
+        if state is None or record.created - state[0] >= self.window:
+            if state and state[2]:
+                record.suppressed = state[2]
+            state = self.windows[key] = [record.created, 0, 0]
+        state[1] += 1
+        if state[1] > self.burst:
+            state[2] += 1
+            return False
+        return True
+
+def setup_logging(config):
+    """Route every log record through a queue to a background writer thread
+
+    The event loop only pays for enqueueing; formatting, console output and
+    the rotating JSON lines file happen on the listener's thread. Returns
+    the started listener; stop it on shutdown to flush.
+    """
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    handlers = [console]
+    if config['LOG_FILE']:
+        log_file = RotatingFileHandler(
+            config['LOG_FILE'],
+            maxBytes=config['LOG_MAX_BYTES'],
+            backupCount=config['LOG_BACKUPS'],
+            encoding='utf-8'
+        )
+        log_file.setFormatter(JsonFormatter())
+        log_file.addFilter(lambda record: record.name != banner_logger.name)
+        handlers.append(log_file)
+
+    queue_handler = QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(SampleFilter(config['LOG_SAMPLE_WINDOW'], config['LOG_SAMPLE_BURST']))
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.handlers[:] = [queue_handler]
+
+    listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+class Metrics:
+    """Hot-path counters, gauges and latency histograms, rendered as Prometheus text
+
+    Every method returns straight away while disabled, so instrumentation
+    costs next to nothing unless someone is looking.
+    """
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.counters = {}  # (name, labels) -> value
+        self.gauges = {}  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [per-bucket counts..., +Inf count, sum]
+        self.gauge_functions = {}  # name -> callable evaluated at render time
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        if not self.enabled:
+            return
+        self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = [0] * (len(self.BUCKETS) + 2)
+        for i, bound in enumerate(self.BUCKETS):
+            if seconds <= bound:
+                histogram[i] += 1
+                break
+        else:
+            histogram[len(self.BUCKETS)] += 1
+        histogram[-1] += seconds
+
+    def gauge_function(self, name, func):
+        self.gauge_functions[name] = func
+
+    def count(self, name):
+        """Total observations of histogram `name` across all labels"""
+        return sum(sum(h[:-1]) for (n, _), h in self.histograms.items() if n == name)
+
+    def quantile(self, name, q, **labels):
+        """Approximate quantile of histogram `name` (bucket upper bound) over series matching `labels`"""
+        wanted = set(labels.items())
+        merged = [0] * (len(self.BUCKETS) + 1)
+        for (n, key_labels), histogram in self.histograms.items():
+            if n == name and wanted <= set(key_labels):
+                for i, value in enumerate(histogram[:-1]):
+                    merged[i] += value
+        total = sum(merged)
+        if not total:
+            return None
+        seen = 0
+        for i, value in enumerate(merged):
+            seen += value
+            if seen >= q * total:
+                return self.BUCKETS[i] if i < len(self.BUCKETS) else float('inf')
+
+    @staticmethod
+    def _labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+
+        def escape(value):
+            return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in pairs) + "}"
+
+    def render(self):
+        """Everything collected so far, in the Prometheus text exposition format"""
+        lines = []
+        typed = set()
+
+        def family(name, kind):
+            # Each metric family is announced once, ahead of its first series
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE qbitbot_{name} {kind}")
+
+        for (name, labels), value in sorted(self.counters.items()):
+            family(name, "counter")
+            lines.append(f"qbitbot_{name}{self._labels(labels)} {value}")
+        for name, func in sorted(self.gauge_functions.items()):
+            try:
+                value = func()
+            except Exception:
+                continue
+            family(name, "gauge")
+            lines.append(f"qbitbot_{name} {value}")
+        for (name, labels), value in sorted(self.gauges.items()):
+            family(name, "gauge")
+            lines.append(f"qbitbot_{name}{self._labels(labels)} {value}")
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            family(name, "histogram")
+            cumulative = 0
+            for bound, value in zip(self.BUCKETS, histogram):
+                cumulative += value
+                lines.append(f"qbitbot_{name}_bucket{self._labels(labels, [('le', bound)])} {cumulative}")
+            cumulative += histogram[len(self.BUCKETS)]
+            lines.append(f"qbitbot_{name}_bucket{self._labels(labels, [('le', '+Inf')])} {cumulative}")
+            lines.append(f"qbitbot_{name}_sum{self._labels(labels)} {histogram[-1]}")
+            lines.append(f"qbitbot_{name}_count{self._labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+# Shared by every instrumented component; the bot switches it on from config
+metrics = Metrics()
 
 # Constants
 class Status:
@@ -44,22 +240,120 @@ class Config:
     NOTHING_DOWNLOADING = "Nothing is downloading! Why not request something?"
     DOWNLOADING_STATUS = "downloading"
     COMPLETE_STATUS = "completed"
+    STALLED_STATUS = "stalled"
     MAX_DISCORD_CHARS = 1700
+    EMBED_DESCRIPTION_CHARS = 4096
+    PAGE_SIZE = 8  # Torrents per status page, well inside an embed's 4096 characters
+    MAX_STATUS_VIEWS = 3  # Status views per channel; a new one retires the oldest
+    RENDER_CACHE_SIZE = 2000  # Rendered torrent rows kept for reuse
+    SUMMARY_TOP = 5  # Fastest torrents listed by `$status summary`
+    DETAILS_TTL = 60  # Seconds a `$details` fetch is reused
+    DETAILS_CACHE_FILES = 20000  # File entries kept across cached `$details` fetches
+    DETAILS_PAGE_SIZE = 15  # Files per `$details` page
+    FIND_LIMIT = 10  # Matches shown by $find
+    STATUS_FILTERS = ("all", COMPLETE_STATUS, DOWNLOADING_STATUS, STALLED_STATUS)
+    CONTROL_PREVIEW = 10  # Torrent names listed when a control command reports back
+    CATEGORY_ALIASES = ("all", "tv", "movies", "tv-sonarr", "radarr")
+    QBIT_TIMEOUT = 15  # Seconds before a qBittorrent call is abandoned
+    QBIT_WORKERS = 4  # Concurrent qBittorrent requests
+    REFRESH_INTERVAL = 300  # Seconds between auto-updates when things change slowly
+    REFRESH_MIN_INTERVAL = 30  # ...while something is actively downloading
+    REFRESH_MAX_INTERVAL = 1800  # ...at most, after backing off from an idle library
+    NOTIFY_DEBOUNCE = 45  # Seconds of quiet before a batch of notifications goes out
+    NOTIFY_MAX_DELAY = 300  # ...but no batch is held back longer than this
+    STATS_DB = ''  # Transfer history for $stats, e.g. 'bot_stats.db'; off by default (see load_env)
+    METRICS_HOST = '127.0.0.1'  # Where the Prometheus endpoint listens
+    HOOK_HOST = '127.0.0.1'  # Where qBittorrent's add/finish hook pings arrive
+    HOOK_DEBOUNCE = 2.0  # Seconds to gather hook pings before refreshing their torrents
+    STATE_FILE = 'bot_state.json'  # Status views and refresh state across restarts; empty to disable
+    TRACKED_MESSAGES = 500  # Own and command messages remembered per channel for cleanup
+    MESSAGE_CACHE = 100  # Messages discord.py keeps in memory; controls don't need them
+    AUTOCOMPLETE_LIMIT = 25  # Discord shows at most this many suggestions
+    LOG_FILE = 'bot.log'  # JSON lines; empty to log to the console only
+    LOG_MAX_BYTES = 10 * 2**20  # Rotate the log file at 10 MiB
+    LOG_BACKUPS = 5
+    LOG_SAMPLE_WINDOW = 60.0  # Repetitive log events are capped per this many seconds
+    LOG_SAMPLE_BURST = 5
 
     @staticmethod
     def load_env():
         load_dotenv()
         return {
             'BOT_CHANNEL': os.getenv('BOT_CHANNEL'),
+            # Comma-separated list of every channel the bot answers in
+            'BOT_CHANNELS': {c.strip() for c in (os.getenv('BOT_CHANNEL') or '').split(',') if c.strip()},
             'TV_CATEGORY': os.getenv('TV_CATEGORY', 'tv-sonarr'),
             'MOVIE_CATEGORY': os.getenv('MOVIE_CATEGORY', 'radarr'),
+            'QBIT_INSTANCES': Config.load_instances(),
             'QBIT_HOST': os.getenv('QBIT_HOST'),
             'QBIT_PORT': os.getenv('QBIT_PORT'),
             'QBIT_USERNAME': os.getenv('QBIT_USERNAME'),
             'QBIT_PASSWORD': os.getenv('QBIT_PASSWORD'),
+            'QBIT_TIMEOUT': float(os.getenv('QBIT_TIMEOUT', Config.QBIT_TIMEOUT)),
+            'QBIT_WORKERS': int(os.getenv('QBIT_WORKERS', Config.QBIT_WORKERS)),
+            'REFRESH_INTERVAL': float(os.getenv('REFRESH_INTERVAL', Config.REFRESH_INTERVAL)),
+            'REFRESH_MIN_INTERVAL': float(os.getenv('REFRESH_MIN_INTERVAL', Config.REFRESH_MIN_INTERVAL)),
+            'REFRESH_MAX_INTERVAL': float(os.getenv('REFRESH_MAX_INTERVAL', Config.REFRESH_MAX_INTERVAL)),
+            'NOTIFY_CHANNELS': {c.strip() for c in os.getenv('NOTIFY_CHANNELS', '').split(',') if c.strip()},
+            'NOTIFY_EVENTS': {e.strip().lower() for e in os.getenv('NOTIFY_EVENTS', ','.join(TorrentEvent.KINDS)).split(',') if e.strip()},
+            'NOTIFY_DEBOUNCE': float(os.getenv('NOTIFY_DEBOUNCE', Config.NOTIFY_DEBOUNCE)),
+            'NOTIFY_MAX_DELAY': float(os.getenv('NOTIFY_MAX_DELAY', Config.NOTIFY_MAX_DELAY)),
+            # History listens to every sync delta, so it keeps the full sync/maindata table
+            # live and filtered views no longer use server-side torrents_info filters
+            'STATS_DB': os.getenv('STATS_DB', Config.STATS_DB),
+            'STATE_FILE': os.getenv('STATE_FILE', Config.STATE_FILE),
+            # Role names or IDs allowed to pause, resume, recheck, recategorize and delete
+            'CONTROL_ROLES': {r.strip() for r in os.getenv('CONTROL_ROLE', '').split(',') if r.strip()},
+            'METRICS_ENABLED': os.getenv('METRICS_ENABLED', '').lower() in ('1', 'true', 'yes', 'on') or bool(os.getenv('METRICS_PORT')),
+            'METRICS_HOST': os.getenv('METRICS_HOST', Config.METRICS_HOST),
+            'METRICS_PORT': int(os.getenv('METRICS_PORT') or 0),
+            'HOOK_HOST': os.getenv('HOOK_HOST', Config.HOOK_HOST),
+            'HOOK_PORT': int(os.getenv('HOOK_PORT') or 0),
+            'HOOK_TOKEN': os.getenv('HOOK_TOKEN', ''),
+            'HOOK_DEBOUNCE': float(os.getenv('HOOK_DEBOUNCE', Config.HOOK_DEBOUNCE)),
+            'LOG_FILE': os.getenv('LOG_FILE', Config.LOG_FILE),
+            'LOG_MAX_BYTES': int(os.getenv('LOG_MAX_BYTES', Config.LOG_MAX_BYTES)),
+            'LOG_BACKUPS': int(os.getenv('LOG_BACKUPS', Config.LOG_BACKUPS)),
+            'LOG_BANNERS': os.getenv('LOG_BANNERS', '').lower() in ('1', 'true', 'yes', 'on'),
+            'LOG_SAMPLE_WINDOW': float(os.getenv('LOG_SAMPLE_WINDOW', Config.LOG_SAMPLE_WINDOW)),
+            'LOG_SAMPLE_BURST': int(os.getenv('LOG_SAMPLE_BURST', Config.LOG_SAMPLE_BURST)),
+            # `$` commands need the privileged message content intent; slash commands don't
+            'PREFIX_COMMANDS': os.getenv('PREFIX_COMMANDS', 'true').lower() in ('1', 'true', 'yes', 'on'),
+            'MESSAGE_CACHE': int(os.getenv('MESSAGE_CACHE', Config.MESSAGE_CACHE)),
+            # Force a slash command sync; otherwise it happens only when the commands change
+            'SYNC_COMMANDS': os.getenv('SYNC_COMMANDS', '').lower() in ('1', 'true', 'yes', 'on'),
             'DISCORD_TOKEN': os.getenv('DISCORD_TOKEN')
         }
 
+    @staticmethod
+    def load_instances():
+        """Named qBittorrent backends from QBIT_INSTANCES, or the single QBIT_* one"""
+        default_timeout = float(os.getenv('QBIT_TIMEOUT', Config.QBIT_TIMEOUT))
+        names = [n.strip() for n in os.getenv('QBIT_INSTANCES', '').split(',') if n.strip()]
+        if not names:
+            return [{
+                'name': 'default',
+                'host': os.getenv('QBIT_HOST'),
+                'port': os.getenv('QBIT_PORT'),
+                'username': os.getenv('QBIT_USERNAME'),
+                'password': os.getenv('QBIT_PASSWORD'),
+                'timeout': default_timeout
+            }]
+
+        instances = []
+        for name in names:
+            # e.g. QBIT_SEEDBOX_HOST for an instance called "seedbox"
+            prefix = f"QBIT_{name.upper().replace('-', '_')}_"
+            instances.append({
+                'name': name,
+                'host': os.getenv(prefix + 'HOST'),
+                'port': os.getenv(prefix + 'PORT'),
+                'username': os.getenv(prefix + 'USERNAME', os.getenv('QBIT_USERNAME')),
+                'password': os.getenv(prefix + 'PASSWORD', os.getenv('QBIT_PASSWORD')),
+                'timeout': float(os.getenv(prefix + 'TIMEOUT', default_timeout))
+            })
+        return instances
+
     @staticmethod
     def map_category(category):
         category_map = {
@@ -70,9 +364,137 @@ class Config:
         }
         return category_map.get(category.lower(), category)
 
+class AsyncQbitClient:
+    """Run blocking qBittorrent API calls off the event loop"""
+
+    def __init__(self, client, max_workers=Config.QBIT_WORKERS, timeout=Config.QBIT_TIMEOUT, name='default'):
+        self.client = client
+        self.timeout = timeout
+        self.name = name  # Backend name, for metrics
+        # Bounded pool so a slow WebUI can't pile up threads
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='qbit')
+
+    async def call(self, method, *args, timeout=None, **kwargs):
+        """Await `client.<method>(*args, **kwargs)` in the worker pool"""
+        loop = asyncio.get_running_loop()
+        func = functools.partial(getattr(self.client, method), *args, **kwargs)
+        future = loop.run_in_executor(self.executor, func)
+        started = time.perf_counter()
+        try:
+            # Cancelling the await (or timing out) releases the caller immediately;
+            # the worker itself is bounded by the requests timeout
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        except Exception:
+            metrics.inc('qbit_errors_total', instance=self.name, method=method)
+            raise
+        finally:
+            metrics.observe('qbit_call_seconds', time.perf_counter() - started, instance=self.name, method=method)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+class TorrentRecord:
+    """Raw numeric state of one torrent; formatting happens only when it is rendered"""
+    __slots__ = ('hash', 'instance', 'name', 'category', 'state', 'status', 'progress', 'eta', 'size', 'dlspeed')
+
+    # The only torrent fields the status renderer uses; the rest are dropped on arrival
+    FIELDS = ('name', 'category', 'progress', 'state', 'eta', 'size', 'dlspeed')
+
+    def __init__(self, torrent_hash, instance='default'):
+        self.hash = torrent_hash
+        self.instance = instance  # Name of the qBittorrent backend it lives on
+        self.name = ''
+        self.category = ''
+        self.state = ''
+        self.status = Status.UNKNOWN
+        self.progress = 0.0
+        self.eta = 0
+        self.size = 0
+        self.dlspeed = 0
+
+    def update(self, fields):
+        """Apply a (possibly partial) set of API fields"""
+        for field in self.FIELDS:
+            if field in fields:
+                setattr(self, field, fields[field])
+        # Thousands of torrents share a handful of states and categories
+        self.state = sys.intern(self.state)
+        self.category = sys.intern(self.category)
+
+class TorrentDelta:
+    """What one sync changed in a backend's torrent table"""
+    __slots__ = ('initial', 'added', 'removed', 'transitions', 'renamed')
+
+    def __init__(self, initial):
+        self.initial = initial  # The table was built from nothing; nothing here is news
+        self.added = []
+        self.removed = []
+        self.transitions = []  # (record, status before)
+        self.renamed = []  # (record, name before)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.transitions or self.renamed)
+
+class TorrentSummary:
+    """Dashboard totals for a set of torrents, gathered in a single pass"""
+    __slots__ = ('count', 'by_status', 'by_category', 'dlspeed', 'size', 'remaining',
+                 'worst_eta', 'no_eta', 'fastest')
+
+    def __init__(self, torrents, top=Config.SUMMARY_TOP):
+        self.count = 0
+        self.by_status = {}
+        self.by_category = {}
+        self.dlspeed = 0
+        self.size = 0
+        self.remaining = 0  # Bytes still to download
+        self.worst_eta = 0  # Longest finite ETA
+        self.no_eta = 0  # Downloads with no ETA at all (stalled, queued, paused)
+
+        # Min-heap of the `top` fastest, so each row costs O(log top) at most
+        fastest = []
+        for seq, torrent in enumerate(torrents):
+            self.count += 1
+            self.by_status[torrent.status] = self.by_status.get(torrent.status, 0) + 1
+            self.by_category[torrent.category] = self.by_category.get(torrent.category, 0) + 1
+            self.size += torrent.size
+            if torrent.progress < 1:
+                self.remaining += torrent.size * (1 - torrent.progress)
+                if torrent.eta >= 8640000:
+                    self.no_eta += 1
+                elif torrent.eta > self.worst_eta:
+                    self.worst_eta = torrent.eta
+            if torrent.dlspeed:
+                self.dlspeed += torrent.dlspeed
+                if len(fastest) < top:
+                    heapq.heappush(fastest, (torrent.dlspeed, seq, torrent))
+                elif torrent.dlspeed > fastest[0][0]:
+                    heapq.heapreplace(fastest, (torrent.dlspeed, seq, torrent))
+        self.fastest = [torrent for _, _, torrent in sorted(fastest, reverse=True)]
+
+class TorrentDetails:
+    """One torrent's files, trackers and properties, as fetched for `$details`"""
+    __slots__ = ('files', 'trackers', 'properties')
+
+    def __init__(self, files, trackers, properties):
+        # Only what gets shown is kept, to stay small for packs with thousands of files
+        self.files = [
+            (f['name'], f['size'], f['progress'], f['priority'], f.get('availability', -1))
+            for f in files
+        ]
+        self.trackers = [
+            (t['url'], t['status'], t.get('num_seeds', -1), t.get('num_peers', -1), t.get('msg', ''))
+            for t in trackers if not t['url'].startswith('** [')  # DHT, PeX and LSD pseudo-trackers
+        ]
+        self.properties = {
+            key: properties.get(key)
+            for key in ('save_path', 'pieces_have', 'pieces_num', 'piece_size', 'seeds', 'seeds_total',
+                        'peers', 'peers_total', 'total_wasted', 'share_ratio')
+        }
+
 class TorrentManager:
-    def __init__(self, client):
+    def __init__(self, client, name='default'):
         self.client = client
+        self.name = name
         self.status_map = {
             'uploading': Status.COMPLETED,
             'pausedUP': Status.COMPLETED,
@@ -87,31 +509,172 @@ class TorrentManager:
             'pausedDL': Status.PAUSED
         }
 
-    def get_torrent_list(self):
-        try:
-            torrent_list = []
-            for torrent in self.client.torrents_info():
-                torrent_list.append({
-                    'name': torrent.name,
-                    'category': torrent.category,
-                    'progress': f"{round(torrent.progress*100,2)}%",
-                    'state': self._map_state(torrent.state),
-                    'eta': self._format_eta(torrent.eta),
-                    'size': self._format_size(torrent.size),
-                    'download_speed': self._format_speed(torrent.dlspeed)
-                })
-            return torrent_list
-        except Exception as e:
-            logger.error(f"Error getting torrent list: {str(e)}")
-            return []
+        # Persistent torrent table kept current with sync/maindata deltas
+        self.torrents = {}  # hash -> TorrentRecord
+        self.rid = 0  # Response ID of the last applied delta
+        self.sync_lock = asyncio.Lock()  # Deltas must be applied in rid order
+        self.last_snapshots = {}  # Last successful filtered fetches, kept for outages
+        self.last_change_count = 0  # Torrents added, removed or changed by the last delta
+        self.server_state = {}  # Global transfer info from sync/maindata
+        # Called as listener(manager, delta) with a TorrentDelta after each sync
+        self.listeners = []
+
+    async def sync(self):
+        """Apply the changes since the last sync to the torrent table"""
+        async with self.sync_lock:
+            try:
+                data = await self.client.call('sync_maindata', rid=self.rid, SIMPLE_RESPONSES=True)
+            except Exception:
+                # Start over with a full resync next time
+                self.rid = 0
+                raise
+            self._apply_sync(data)
+
+    def _apply_sync(self, data):
+        # Changes are only news once we have a previous table to compare with
+        baseline = bool(self.rid or self.torrents)
+
+        # The server asks for a full resync by sending the complete table;
+        # the old table is kept aside so its records can be matched up again
+        previous = None
+        if data.get('full_update'):
+            previous, self.torrents = self.torrents, {}
+            self.server_state = {}
+        self.server_state.update(data.get('server_state', {}))
+
+        delta = TorrentDelta(initial=not baseline)
+
+        # Only the fields that changed are sent for existing torrents
+        for torrent_hash, changes in data.get('torrents', {}).items():
+            record = self.torrents.get(torrent_hash)
+            if record is None and previous:
+                record = previous.pop(torrent_hash, None)
+                if record is not None:
+                    self.torrents[torrent_hash] = record
+            if record is None:
+                record = self.torrents[torrent_hash] = TorrentRecord(torrent_hash, self.name)
+                delta.added.append(record)
+                self._update_record(record, changes)
+                continue
+
+            before, name_before = record.status, record.name
+            self._update_record(record, changes)
+            if record.status != before:
+                delta.transitions.append((record, before))
+            if record.name != name_before:
+                delta.renamed.append((record, name_before))
+
+        for torrent_hash in data.get('torrents_removed', []):
+            record = self.torrents.pop(torrent_hash, None)
+            if record is not None:
+                delta.removed.append(record)
+        if previous:
+            # Whatever the full resync didn't mention is gone
+            delta.removed.extend(previous.values())
+
+        self.rid = data.get('rid', 0)
+        self.last_change_count = len(data.get('torrents', {})) + len(delta.removed)
+
+        # The first table goes out even when empty, so listeners learn the backend is up
+        if delta or delta.initial:
+            for listener in self.listeners:
+                listener(self, delta)
+
+    def _update_record(self, record, fields):
+        record.update(fields)
+        record.status = self._map_state(record.state)
+        return record
+
+    @staticmethod
+    def _query_params(category="all", status_filter="all", hashes=None):
+        """Translate our filters to the server-side `torrents_info` parameters"""
+        params = {}
+        if category != "all":
+            params['category'] = category
+        # qBittorrent's "completed" filter is a superset of our completed states.
+        # Our "downloading" (anything not completed) has no server-side equivalent,
+        # so it is left to the client-side filter.
+        if status_filter == Config.COMPLETE_STATUS:
+            params['status_filter'] = 'completed'
+        elif status_filter == Config.STALLED_STATUS:
+            params['status_filter'] = 'stalled_downloading'
+        if hashes:
+            params['torrent_hashes'] = list(hashes)
+        return params
+
+    async def fetch(self, category="all", status_filter="all", hashes=None):
+        """Return the torrent records that may match the given filters"""
+        # Once the table is live a delta sync is cheaper than any filtered query,
+        # and an unfiltered view or a change listener needs the whole table anyway
+        if self.rid or self.listeners or (category == "all" and status_filter == "all" and not hashes):
+            await self.sync()
+            if hashes:
+                return [self.torrents[h] for h in hashes if h in self.torrents]
+            return list(self.torrents.values())
+
+        params = self._query_params(category, status_filter, hashes)
+        torrents = await self.client.call('torrents_info', SIMPLE_RESPONSES=True, **params)
+        return [self._update_record(TorrentRecord(torrent['hash'], self.name), torrent) for torrent in torrents]
+
+    async def get_snapshots(self, filter_keys):
+        """Fetch once for every distinct (category, status_filter) pair in `filter_keys`"""
+        filter_keys = set(filter_keys)
+        if len(filter_keys) == 1:
+            key = next(iter(filter_keys))
+            snapshots = {key: await self.get_torrent_list(*key)}
+        else:
+            # Several views share one unfiltered snapshot
+            torrents = await self.get_torrent_list()
+            snapshots = {key: torrents for key in filter_keys}
+        self.last_snapshots = snapshots
+        return snapshots
+
+    async def details(self, torrent_hash):
+        """Files, trackers and properties of one torrent, fetched concurrently"""
+        files, trackers, properties = await asyncio.gather(
+            self.client.call('torrents_files', torrent_hash=torrent_hash),
+            self.client.call('torrents_trackers', torrent_hash=torrent_hash),
+            self.client.call('torrents_properties', torrent_hash=torrent_hash),
+        )
+        return TorrentDetails(files, trackers, properties)
+
+    def stale_snapshots(self, filter_keys):
+        """Last known torrents for `filter_keys`, for when the backend is unreachable"""
+        if self.torrents:
+            torrents = list(self.torrents.values())
+            return {key: torrents for key in filter_keys}
+        return {key: self.last_snapshots.get(key, []) for key in filter_keys}
+
+    async def get_torrent_list(self, category="all", status_filter="all", hashes=None):
+        return await self.fetch(category, status_filter, hashes)
 
     def _map_state(self, state):
         return self.status_map.get(state, Status.UNKNOWN)
 
-    def _format_eta(self, seconds):
+    @staticmethod
+    def _format_progress(progress):
+        return f"{round(progress*100,2)}%"
+
+    @staticmethod
+    def _format_eta(seconds):
         if seconds == 8640000:
             return "∞"
-        
+
+        duration = TorrentManager._format_duration(seconds)
+        return 'ETA: ' + duration if duration else 'Done'
+
+    @staticmethod
+    def _eta_bucket(seconds):
+        """A key shared by exactly the ETAs that `_format_eta` renders the same"""
+        # Only the two largest non-zero units are shown, so within a unit the
+        # next one down decides the text, unless it is zero and a smaller one shows
+        for unit, next_unit in ((604800, 86400), (86400, 3600), (3600, 60)):
+            if seconds >= unit and seconds % unit >= next_unit:
+                return next_unit, seconds // next_unit
+        return 1, seconds
+
+    @staticmethod
+    def _format_duration(seconds):
         intervals = [
             ('weeks', 604800),
             ('days', 86400),
@@ -128,466 +691,2817 @@ class TorrentManager:
                 name = name[:-1] if value == 1 else name
                 parts.append(f"{value} {name}")
         
-        return 'ETA: ' + ', '.join(parts[:2]) if parts else 'Done'
+        return ', '.join(parts[:2])
 
-    def _format_size(self, size_bytes):
+    @staticmethod
+    def _format_size(size_bytes):
         for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
             if size_bytes < 1024:
                 return f"{size_bytes:.2f} {unit}"
             size_bytes /= 1024
         return f"{size_bytes:.2f} PB"
 
-    def _format_speed(self, speed_bytes):
-        return self._format_size(speed_bytes) + "/s"
+    @staticmethod
+    def _format_speed(speed_bytes):
+        return TorrentManager._format_size(speed_bytes) + "/s"
 
-class DiscordBot(commands.Bot):
-    def __init__(self):
-        intents = discord.Intents.default()
-        intents.message_content = True
-        intents.reactions = True
-        super().__init__(
-            command_prefix='$',
-            intents=intents,
-            help_command=commands.DefaultHelpCommand(
-                no_category="Available Commands",
-                width=120,
-                sort_commands=False
-            )
-        )
-        
-        # Load configuration
-        self.config = Config.load_env()
-        
-        # Initialize qBittorrent client
-        self.qbt_client = self._setup_qbit_client()
-        self.torrent_manager = TorrentManager(self.qbt_client)
+class TorrentFederation:
+    """Several qBittorrent backends, fetched concurrently and merged into one source"""
 
-        # Status update tracking
-        self.last_status_message = None
-        self.auto_update_task = None
-        self.update_interval = 300  # Update every 5 minutes
-        self.current_category = "all"  # Track current category filter
-        self.current_status_filter = "all"  # Track current status filter
-        self.auto_refresh_enabled = True  # Track auto-refresh state
-        self.refresh_reaction_users = set()  # Track users who have added the refresh reaction
+    def __init__(self, managers):
+        self.managers = {manager.name: manager for manager in managers}
+        self.errors = {}  # Backend name -> why its last fetch failed
 
-        # Register commands
-        self.add_commands()
+    @property
+    def multiple(self):
+        return len(self.managers) > 1
 
-    def _setup_qbit_client(self):
-        try:
-            client = qbittorrentapi.Client(
-                host=self.config['QBIT_HOST'],
-                port=self.config['QBIT_PORT'],
-                username=self.config['QBIT_USERNAME'],
-                password=self.config['QBIT_PASSWORD']
-            )
-            client.auth_log_in()
-            return client
-        except Exception as e:
-            logger.error(f"Failed to connect to qBittorrent: {str(e)}")
-            raise
+    @property
+    def last_change_count(self):
+        return sum(manager.last_change_count for manager in self.managers.values())
 
-    def _log_command(self, ctx, command_name, args=None):
-        """Log command usage with user details"""
-        user = ctx.author
-        guild = ctx.guild
-        channel = ctx.channel
-        
-        # Format the command and its arguments
-        command_str = f"${command_name}"
-        if args:
-            command_str += f" {' '.join(str(arg) for arg in args)}"
-        
-        # Create a visually distinct log message
-        log_message = (
-            f"\n{'='*50}\n"
-            f"Command executed by: {user.name}#{user.discriminator} (ID: {user.id})\n"
-            f"Server: {guild.name} (ID: {guild.id})\n"
-            f"Channel: #{channel.name} (ID: {channel.id})\n"
-            f"Command: {command_str}\n"
-            f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-            f"{'='*50}"
-        )
-        
-        # Print to console and log file
-        print(log_message)
-        logger.info(f"Command executed: {command_str} by {user.name}#{user.discriminator}")
-
-    def _log_reaction(self, reaction, user, action):
-        """Log reaction events with user details"""
-        # Create a visually distinct log message
-        log_message = (
-            f"\n{'='*50}\n"
-            f"Reaction {action} by: {user.name}#{user.discriminator} (ID: {user.id})\n"
-            f"Server: {reaction.message.guild.name} (ID: {reaction.message.guild.id})\n"
-            f"Channel: #{reaction.message.channel.name} (ID: {reaction.message.channel.id})\n"
-            f"Emoji: {reaction.emoji}\n"
-            f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-            f"{'='*50}"
-        )
-        
-        # Print to console and log file
-        print(log_message)
-        logger.info(f"Reaction {action}: {reaction.emoji} by {user.name}#{user.discriminator}")
+    @property
+    def torrents(self):
+        """Every record in every backend's sync table"""
+        for manager in self.managers.values():
+            yield from manager.torrents.values()
 
-    def add_commands(self):
-        @self.event
-        async def on_ready():
-            startup_message = (
-                f"\n{'='*50}\n"
-                f"Bot is ready!\n"
-                f"Logged in as: {self.user.name} (ID: {self.user.id})\n"
-                f"Connected to {len(self.guilds)} servers\n"
-                f"Monitoring channel ID: {self.config['BOT_CHANNEL']}\n"
-                f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-                f"{'='*50}"
-            )
-            print(startup_message)
-            logger.info(f'Bot is ready: {self.user.name} ({self.user.id})')
-            await self.change_presence(activity=discord.Game(name="Type $help for commands! 🤖"))
-            
-            # Start the auto-update task
-            if self.auto_update_task is None:
-                self.auto_update_task = self.loop.create_task(self._auto_update_status())
+    def server_totals(self):
+        """Summed (download, upload) speed across backends, in bytes/s"""
+        dl = sum(m.server_state.get('dl_info_speed', 0) for m in self.managers.values())
+        up = sum(m.server_state.get('up_info_speed', 0) for m in self.managers.values())
+        return dl, up
 
-        @self.event
-        async def on_command_error(ctx, error):
-            if isinstance(error, commands.errors.CommandNotFound):
-                await ctx.send(f"❌ Unknown command. Type `$help` to see available commands!")
-                self._log_command(ctx, ctx.message.content, ["ERROR: Command not found"])
-            else:
-                await ctx.send(f"❌ An error occurred: {str(error)}")
-                self._log_command(ctx, ctx.message.content, [f"ERROR: {str(error)}"])
+    def categories(self):
+        """Every category in use in the sync tables or the last filtered fetches"""
+        categories = set()
+        for manager in self.managers.values():
+            # Without a live table, the filtered fetches are all we have seen
+            sources = [manager.torrents.values()] if manager.torrents else manager.last_snapshots.values()
+            for torrents in sources:
+                categories.update(torrent.category for torrent in torrents if torrent.category)
+        return categories
 
-        @self.command(name='status', 
-                     brief="📥 Check your torrent downloads (Auto-updates every 5 minutes)",
-                     help="""
-🔍 **How to use the status command:**
+    def add_listener(self, listener):
+        for manager in self.managers.values():
+            manager.listeners.append(listener)
 
-1️⃣ Basic Usage:
-   `$status` - Shows all your torrents
+    def remove_listener(self, listener):
+        for manager in self.managers.values():
+            if listener in manager.listeners:
+                manager.listeners.remove(listener)
 
-2️⃣ Filter by Category:
-   `$status movies` - Shows only movie torrents
-   `$status tv` - Shows only TV show torrents
+    async def get_snapshots(self, filter_keys):
+        """Merged snapshots of every backend; a failing backend contributes its last known rows"""
+        filter_keys = set(filter_keys)
+        results = await asyncio.gather(*(
+            self._backend_snapshots(manager, filter_keys) for manager in self.managers.values()
+        ))
 
-3️⃣ Filter by Status:
-   `$status completed` - Shows finished downloads
-   `$status downloading` - Shows active downloads
+        merged = {key: [] for key in filter_keys}
+        for snapshots in results:
+            for key in filter_keys:
+                merged[key].extend(snapshots.get(key, ()))
+        return merged
 
-4️⃣ Combine Filters:
-   `$status movies completed` - Shows finished movie downloads
-   `$status tv downloading` - Shows TV shows currently downloading
+    async def _backend_snapshots(self, manager, filter_keys):
+        try:
+            # Each backend gets its own deadline so one slow box can't hold up the rest
+            snapshots = await asyncio.wait_for(manager.get_snapshots(filter_keys), manager.client.timeout)
+        except Exception as e:
+            error = "did not respond in time" if isinstance(e, asyncio.TimeoutError) else str(e)
+            logger.error(f"Error getting torrent list from {manager.name}: {error}",
+                         extra={'event': 'backend_error', 'instance': manager.name, 'sample': f"backend_error:{manager.name}"})
+            self.errors[manager.name] = error
+            return manager.stale_snapshots(filter_keys)
 
-💡 **Tips:**
-• Status automatically updates every 5 minutes
-• Use `$status all` to see everything
-• Downloads are automatically sorted by progress
-• Each torrent shows:
-  - Name
-  - Progress percentage
-  - Download speed
-  - Estimated time remaining
-  - File size
+        self.errors.pop(manager.name, None)
+        return snapshots
 
-❓ Need more help? Just type `$help` for all commands!
-""")
-        async def status(ctx, category="all", status_filter="all"):
-            # Log the command
-            self._log_command(ctx, "status", [category, status_filter])
+    async def fetch_hashes(self, hashes, instance=None):
+        """Current records for `hashes`, from one named backend or from all of them"""
+        managers = [self.managers[instance]] if instance else list(self.managers.values())
+        results = await asyncio.gather(*(
+            asyncio.wait_for(manager.fetch(hashes=hashes), manager.client.timeout) for manager in managers
+        ), return_exceptions=True)
 
-            if str(ctx.channel.id) != self.config['BOT_CHANNEL']:
-                await ctx.send("❌ Oops! I can only respond to commands in the designated download status channel!")
-                return
+        records = []
+        for manager, result in zip(managers, results):
+            if isinstance(result, Exception):
+                error = "did not respond in time" if isinstance(result, asyncio.TimeoutError) else str(result)
+                logger.error(f"Error fetching hooked torrents from {manager.name}: {error}")
+                continue
+            records.extend(result)
+        return records
+
+    async def apply(self, method, torrents, **params):
+        """Call `method` once per backend, with every affected hash batched into it
+
+        Returns backend name -> error for the backends where the call failed.
+        """
+        batches = {}
+        for torrent in torrents:
+            batches.setdefault(torrent.instance, []).append(torrent.hash)
 
+        async def apply_batch(name, hashes):
             try:
-                # Clean up old messages
-                await self._clean_channel(ctx)
-                
-                # Update status
-                await self._update_status_message(ctx, category, status_filter)
+                await self.managers[name].client.call(method, torrent_hashes=hashes, **params)
+            except Exception as e:
+                error = "did not respond in time" if isinstance(e, asyncio.TimeoutError) else str(e)
+                logger.error(f"Error running {method} on {name}: {error}")
+                return name, error
+            return name, None
 
+        results = await asyncio.gather(*(apply_batch(name, hashes) for name, hashes in batches.items()))
+        return {name: error for name, error in results if error}
+
+    async def login(self):
+        for manager in self.managers.values():
+            try:
+                await manager.client.call('auth_log_in')
             except Exception as e:
-                logger.error(f"Error in status command: {str(e)}")
-                embed = discord.Embed(
-                    title="❌ Error",
-                    description=f"Oops! Something went wrong: {str(e)}\nPlease try again later or contact the admin if this persists.",
-                    color=discord.Color.red()
-                )
-                await ctx.send(embed=embed)
+                # A dead backend only degrades its own rows; it may come back later
+                logger.error(f"Failed to connect to qBittorrent instance {manager.name}: {str(e)}")
 
-        @self.command(name='help_downloads',
-                     brief="📚 Learn how to use the download status bot",
-                     help="""
-🤖 **Welcome to the Download Status Bot!**
+    def close(self):
+        for manager in self.managers.values():
+            manager.client.close()
 
-This bot helps you keep track of your downloads from qBittorrent. Here's how to use it:
+class TorrentEvent:
+    """A state change worth telling people about"""
+    __slots__ = ('kind', 'record')
 
-📋 **Basic Commands:**
-1. `$status` - Shows all your downloads
-2. `$help` - Shows this help message
+    COMPLETED = 'completed'
+    STALLED = 'stalled'
+    MISSING = 'missing'
+    ADDED = 'added'
+    REMOVED = 'removed'
+    KINDS = (COMPLETED, STALLED, MISSING, ADDED, REMOVED)
 
-🎯 **Filtering Downloads:**
-• By Category:
-  `$status movies` - Only movie downloads
-  `$status tv` - Only TV show downloads
+    def __init__(self, kind, record):
+        self.kind = kind
+        self.record = record
 
-• By Status:
-  `$status completed` - Finished downloads
-  `$status downloading` - Active downloads
+class TorrentEventEngine:
+    """Turn torrent table deltas into debounced, batched channel notifications"""
 
-• Combined:
-  `$status movies completed` - Finished movies
-  `$status tv downloading` - TV shows in progress
+    HEADINGS = {
+        TorrentEvent.COMPLETED: "✅ Completed",
+        TorrentEvent.STALLED: "⚠️ Stalled",
+        TorrentEvent.MISSING: "❗ Files missing",
+        TorrentEvent.ADDED: "➕ Added",
+        TorrentEvent.REMOVED: "🗑️ Removed",
+    }
+    MAX_NAMES = 10  # Names listed per kind before summarising the rest
 
-📊 **Understanding the Status:**
-• Each download shows:
-  - 📝 Name of the file
-  - 📈 Progress percentage
-  - ⚡ Download speed
-  - ⏱️ Time remaining
-  - 💾 File size
+    def __init__(self, bot, channel_ids, kinds, debounce=Config.NOTIFY_DEBOUNCE, max_delay=Config.NOTIFY_MAX_DELAY):
+        self.bot = bot
+        self.channel_ids = channel_ids
+        self.kinds = kinds
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.pending = []
+        self.first_event = 0
+        self.last_event = 0
+        self.flush_task = None
 
-💡 **Tips:**
-• Messages update automatically
-• Old messages are cleaned up
-• Downloads are sorted by progress
-• Use emojis to quickly identify status
+    def handle(self, manager, delta):
+        """TorrentManager listener: classify only what the delta touched"""
+        if delta.initial:
+            return
+        events = [TorrentEvent(TorrentEvent.ADDED, record) for record in delta.added]
+        events += [TorrentEvent(TorrentEvent.REMOVED, record) for record in delta.removed]
+        for record, before in delta.transitions:
+            if record.status == Status.COMPLETED:
+                events.append(TorrentEvent(TorrentEvent.COMPLETED, record))
+            elif record.status == Status.STALLED:
+                events.append(TorrentEvent(TorrentEvent.STALLED, record))
+            elif record.status == Status.MISSING:
+                events.append(TorrentEvent(TorrentEvent.MISSING, record))
 
-❓ **Need Help?**
-If something's not working, contact the admin!
-""")
-        async def help_downloads(ctx):
-            # Log the command
-            self._log_command(ctx, "help_downloads")
+        events = [event for event in events if event.kind in self.kinds]
+        if not events:
+            return
 
-            if str(ctx.channel.id) != self.config['BOT_CHANNEL']:
-                await ctx.send("❌ Oops! I can only respond to commands in the designated download status channel!")
-                return
+        now = asyncio.get_running_loop().time()
+        if not self.pending:
+            self.first_event = now
+        self.last_event = now
+        self.pending.extend(events)
+        if self.flush_task is None:
+            self.flush_task = asyncio.ensure_future(self._flush_when_quiet())
 
-            embed = discord.Embed(
-                title="📚 Download Status Bot Help",
-                description=self.get_command('help_downloads').help,
-                color=discord.Color.blue()
-            )
-            embed.set_footer(text="🤖 Type $status to check your downloads!")
-            await ctx.send(embed=embed)
+    async def _flush_when_quiet(self):
+        loop = asyncio.get_running_loop()
+        try:
+            # Keep collecting while the burst goes on, up to max_delay
+            while True:
+                due = min(self.last_event + self.debounce, self.first_event + self.max_delay)
+                delay = due - loop.time()
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            # Torn down without `flush`; say what never went out
+            if self.pending:
+                logger.warning(f"Discarded {len(self.pending)} pending notifications",
+                               extra={'event': 'notifications_discarded', 'count': len(self.pending)})
+            self.pending = []
+            if self.flush_task is asyncio.current_task():
+                self.flush_task = None
+            raise
+        events, self.pending = self.pending, []
+        self.flush_task = None
+        await self.deliver(events)
 
-        @self.event
-        async def on_reaction_add(reaction, user):
-            # Ignore bot's own reactions
-            if user.bot:
-                return
-                
-            # Check if this is our status message
-            if reaction.message == self.last_status_message:
-                emoji = str(reaction.emoji)
-                
-                # If it's not one of our control emojis, remove it
-                if emoji not in ["⏸️", "▶️"]:
-                    await reaction.remove(user)
-                    return
-                
-                # Handle pause emoji
-                if emoji == "⏸️":
-                    self.auto_refresh_enabled = False
-                    
-                    # Update the embed footer
-                    embed = reaction.message.embeds[0]
-                    footer_text = embed.footer.text
-                    footer_text = footer_text.replace("🔄 Auto-refresh enabled", "⏸️ Auto-refresh paused")
-                    embed.set_footer(text=footer_text)
-                    await reaction.message.edit(embed=embed)
-                    
-                    self._log_reaction(reaction, user, "added")
-                    print(f"\n{'='*50}\nAuto-refresh paused by {user.name}#{user.discriminator}\n{'='*50}")
-                
-                # Handle resume emoji
-                elif emoji == "▶️":
-                    self.auto_refresh_enabled = True
-                    
-                    # Update the embed footer
-                    embed = reaction.message.embeds[0]
-                    footer_text = embed.footer.text
-                    footer_text = footer_text.replace("⏸️ Auto-refresh paused", "🔄 Auto-refresh enabled")
-                    embed.set_footer(text=footer_text)
-                    await reaction.message.edit(embed=embed)
-                    
-                    self._log_reaction(reaction, user, "added")
-                    print(f"\n{'='*50}\nAuto-refresh resumed by {user.name}#{user.discriminator}\n{'='*50}")
-                
-                # Remove any other reactions
-                for r in reaction.message.reactions:
-                    if str(r.emoji) not in ["⏸️", "▶️"]:
-                        await r.clear()
+    async def flush(self):
+        """Deliver the batch being collected now instead of waiting out the debounce"""
+        events, self.pending = self.pending, []
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            self.flush_task = None
+        if events:
+            await self.deliver(events)
 
-        @self.event
-        async def on_reaction_remove(reaction, user):
-            # Ignore bot's own reactions
-            if user.bot:
-                return
-                
-            # Check if this is our status message
-            if reaction.message == self.last_status_message:
-                # Check if it's one of our control emojis
-                if str(reaction.emoji) in ["⏸️", "▶️"]:
-                    self._log_reaction(reaction, user, "removed")
-
-    async def _clean_channel(self, ctx):
-        def not_pinned(message):
-            return not message.pinned
-        await ctx.channel.purge(check=not_pinned)
+    def build_embed(self, events):
+        """One compact summary for a whole batch"""
+        by_kind = {}
+        for event in events:
+            by_kind.setdefault(event.kind, []).append(event.record)
 
-    def _filter_torrents(self, torrents, category, status_filter):
-        filtered = []
-        for torrent in torrents:
-            if (category == "all" or torrent['category'] == category) and \
-               (status_filter == "all" or 
-                (status_filter == "completed" and torrent['state'] == Status.COMPLETED) or
-                (status_filter == "downloading" and torrent['state'] != Status.COMPLETED)):
-                filtered.append(torrent)
-        
-        # Sort by progress
-        return sorted(filtered, key=lambda x: float(x['progress'][:-1]), reverse=True)
+        tag_instance = self.bot.torrent_manager.multiple
+        sections = []
+        for kind in TorrentEvent.KINDS:
+            records = by_kind.get(kind)
+            if not records:
+                continue
+            lines = [f"**{self.HEADINGS[kind]}** ({len(records)})"]
+            for record in records[:self.MAX_NAMES]:
+                instance_tag = f" `[{record.instance}]`" if tag_instance else ""
+                lines.append(f"▫️ {record.name}{instance_tag}")
+            if len(records) > self.MAX_NAMES:
+                lines.append(f"▫️ …and {len(records) - self.MAX_NAMES} more")
+            sections.append("\n".join(lines))
 
-    def _format_for_discord(self, torrents):
-        messages = []
-        current_msg = ""
-        
-        for torrent in torrents:
-            # Add emoji based on status
-            status_emoji = "✅" if torrent['state'] == Status.COMPLETED else "⏳"
-            
-            entry = (
-                f"**{torrent['name']}** {status_emoji}\n"
-                f"▫️ Progress: `{torrent['progress']}` | Status: `{torrent['state']}`\n"
-                f"▫️ Size: `{torrent['size']}` | Speed: `{torrent['download_speed']}`\n"
-                f"▫️ {torrent['eta']}\n\n"
-            )
-            
-            if len(current_msg) + len(entry) > Config.MAX_DISCORD_CHARS:
-                messages.append(current_msg)
-                current_msg = entry
-            else:
-                current_msg += entry
-        
-        if current_msg:
-            messages.append(current_msg)
-        
-        return messages
+        description = "\n\n".join(sections)
+        if len(description) > Config.MAX_DISCORD_CHARS:
+            description = description[:Config.MAX_DISCORD_CHARS - 1] + "…"
+        embed = discord.Embed(
+            title="🔔 Torrent Updates",
+            description=description,
+            color=discord.Color.gold(),
+            timestamp=datetime.now()
+        )
+        embed.set_footer(text="💾 Powered by r-lab.ovh")
+        return embed
 
-    async def _update_status_message(self, ctx, category="all", status_filter="all"):
-        try:
-            # Map category to actual qBittorrent category name
-            mapped_category = Config.map_category(category)
-            
-            # Store current filters (store the user-friendly version)
-            self.current_category = category
-            self.current_status_filter = status_filter
+    async def deliver(self, events):
+        embed = self.build_embed(events)
+        for channel_id in self.channel_ids:
+            channel = self.bot.get_channel(int(channel_id))
+            if channel is None:
+                logger.error(f"Notification channel {channel_id} not found")
+                continue
+            try:
+                await self.bot.outbox.send(channel, DiscordOutbox.BACKGROUND, embed=embed)
+            except Exception as e:
+                logger.error(f"Error sending notifications to {channel_id}: {str(e)}")
 
-            # Get and filter torrent list
-            torrents = self.torrent_manager.get_torrent_list()
-            filtered = self._filter_torrents(torrents, mapped_category, status_filter)
-            
-            if not filtered:
-                embed = discord.Embed(
-                    title="No Downloads Found 🤔",
-                    description="Nothing is downloading right now! Why not request something new? 🎬",
-                    color=discord.Color.blue()
+class StatsStore:
+    """Bounded on-disk transfer history
+
+    Every poll writes a raw sample and folds it straight into 1-minute and
+    1-hour rollups, so reads never scan raw samples. Each resolution is a ring
+    with its own retention, pruned as it goes, which keeps the file flat.
+    """
+    MINUTE = 60
+    HOUR = 3600
+    # Seconds each resolution is kept for (0 = raw samples)
+    RETENTION = {
+        0: 6 * 3600,
+        MINUTE: 7 * 86400,
+        HOUR: 400 * 86400,
+    }
+    PRUNE_EVERY = 600  # Seconds between retention sweeps
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS global_samples (
+            ts INTEGER PRIMARY KEY, dlspeed INTEGER, upspeed INTEGER, incomplete INTEGER, total INTEGER);
+        CREATE TABLE IF NOT EXISTS global_rollups (
+            resolution INTEGER, bucket INTEGER, samples INTEGER,
+            dl_sum INTEGER, dl_max INTEGER, up_sum INTEGER, up_max INTEGER,
+            PRIMARY KEY (resolution, bucket));
+        CREATE TABLE IF NOT EXISTS torrent_samples (
+            ts INTEGER, instance TEXT, hash TEXT, progress REAL, dlspeed INTEGER, state TEXT);
+        CREATE INDEX IF NOT EXISTS torrent_samples_ts ON torrent_samples (ts);
+        CREATE TABLE IF NOT EXISTS torrent_rollups (
+            resolution INTEGER, bucket INTEGER, instance TEXT, hash TEXT,
+            samples INTEGER, dl_sum INTEGER, progress REAL,
+            PRIMARY KEY (resolution, bucket, instance, hash));
+        CREATE TABLE IF NOT EXISTS torrent_states (
+            instance TEXT, hash TEXT, name TEXT, status TEXT, since INTEGER, progress REAL,
+            PRIMARY KEY (instance, hash));
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # SQLite work is serialised on its own thread, off the event loop
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='stats')
+        self.db = None
+        self.last_prune = 0
+        self.state_changes = []  # (op, instance, hash, name, status, progress) from deltas
+        self.reconcile = {}  # Instance -> its whole table, to square torrent_states with after a (re)start
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    def _connect(self):
+        if self.db is None:
+            self.db = sqlite3.connect(self.path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.executescript(self.SCHEMA)
+        return self.db
+
+    def handle(self, manager, delta):
+        """TorrentManager listener: remember state changes for the next write"""
+        if delta.initial:
+            # The backend's first table: rows left from a previous run may be stale
+            self.state_changes = [change for change in self.state_changes if change[1] != manager.name]
+            self.reconcile[manager.name] = [(r.hash, r.name, r.status, r.progress) for r in delta.added]
+            return
+        for record in delta.added:
+            self.state_changes.append(('set', record.instance, record.hash, record.name, record.status, record.progress))
+        for record, before in delta.transitions:
+            self.state_changes.append(('set', record.instance, record.hash, record.name, record.status, record.progress))
+        for record, before in delta.renamed:
+            self.state_changes.append(('rename', record.instance, record.hash, record.name, None, None))
+        for record in delta.removed:
+            self.state_changes.append(('delete', record.instance, record.hash, None, None, None))
+
+    async def record(self, federation):
+        """Store one poll's worth of samples"""
+        now = int(time.time())
+        dl, up = federation.server_totals()
+        torrents = []
+        total = 0
+        for torrent in federation.torrents:
+            total += 1
+            # Finished torrents don't move; their state row is enough
+            if torrent.status != Status.COMPLETED:
+                torrents.append((torrent.instance, torrent.hash, torrent.progress, torrent.dlspeed, torrent.state))
+        reconcile, self.reconcile = self.reconcile, {}
+        changes, self.state_changes = self.state_changes, []
+        await self._run(self._write, now, dl, up, total, torrents, reconcile, changes)
+
+    def _write(self, now, dl, up, total, torrents, reconcile, changes):
+        db = self._connect()
+        with db:
+            # `torrents` holds the incomplete ones: anything not yet finished, moving or not
+            db.execute("INSERT OR REPLACE INTO global_samples VALUES (?, ?, ?, ?, ?)",
+                       (now, dl, up, len(torrents), total))
+            for resolution in (self.MINUTE, self.HOUR):
+                db.execute("""
+                    INSERT INTO global_rollups VALUES (?, ?, 1, ?, ?, ?, ?)
+                    ON CONFLICT (resolution, bucket) DO UPDATE SET
+                        samples = samples + 1,
+                        dl_sum = dl_sum + excluded.dl_sum, dl_max = MAX(dl_max, excluded.dl_max),
+                        up_sum = up_sum + excluded.up_sum, up_max = MAX(up_max, excluded.up_max)
+                """, (resolution, now - now % resolution, dl, dl, up, up))
+
+            db.executemany("INSERT INTO torrent_samples VALUES (?, ?, ?, ?, ?, ?)",
+                           [(now, *torrent) for torrent in torrents])
+            for resolution in (self.MINUTE, self.HOUR):
+                bucket = now - now % resolution
+                db.executemany("""
+                    INSERT INTO torrent_rollups VALUES (?, ?, ?, ?, 1, ?, ?)
+                    ON CONFLICT (resolution, bucket, instance, hash) DO UPDATE SET
+                        samples = samples + 1,
+                        dl_sum = dl_sum + excluded.dl_sum, progress = excluded.progress
+                """, [(resolution, bucket, instance, torrent_hash, dlspeed, progress)
+                      for instance, torrent_hash, progress, dlspeed, state in torrents])
+
+            for instance, rows in reconcile.items():
+                self._reconcile(db, now, instance, rows)
+            for op, instance, torrent_hash, name, status, progress in changes:
+                if op == 'delete':
+                    db.execute("DELETE FROM torrent_states WHERE instance = ? AND hash = ?", (instance, torrent_hash))
+                elif op == 'rename':
+                    db.execute("UPDATE torrent_states SET name = ? WHERE instance = ? AND hash = ?",
+                               (name, instance, torrent_hash))
+                else:
+                    db.execute("INSERT OR REPLACE INTO torrent_states VALUES (?, ?, ?, ?, ?, ?)",
+                               (instance, torrent_hash, name, status, now, progress))
+
+            if now - self.last_prune >= self.PRUNE_EVERY:
+                self.last_prune = now
+                self._prune(db, now)
+
+    @staticmethod
+    def _reconcile(db, now, instance, rows):
+        """Make `instance`'s torrent_states match `rows`, keeping `since` where the status held"""
+        present = {torrent_hash for torrent_hash, name, status, progress in rows}
+        stored = {torrent_hash for (torrent_hash,) in
+                  db.execute("SELECT hash FROM torrent_states WHERE instance = ?", (instance,))}
+        db.executemany("DELETE FROM torrent_states WHERE instance = ? AND hash = ?",
+                       [(instance, torrent_hash) for torrent_hash in stored - present])
+        db.executemany("""
+            INSERT INTO torrent_states VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (instance, hash) DO UPDATE SET
+                name = excluded.name, progress = excluded.progress, status = excluded.status,
+                since = CASE WHEN status = excluded.status THEN since ELSE excluded.since END
+        """, [(instance, torrent_hash, name, status, now, progress) for torrent_hash, name, status, progress in rows])
+
+    def _prune(self, db, now):
+        raw_cutoff = now - self.RETENTION[0]
+        db.execute("DELETE FROM global_samples WHERE ts < ?", (raw_cutoff,))
+        db.execute("DELETE FROM torrent_samples WHERE ts < ?", (raw_cutoff,))
+        for resolution in (self.MINUTE, self.HOUR):
+            cutoff = now - self.RETENTION[resolution]
+            db.execute("DELETE FROM global_rollups WHERE resolution = ? AND bucket < ?", (resolution, cutoff))
+            db.execute("DELETE FROM torrent_rollups WHERE resolution = ? AND bucket < ?", (resolution, cutoff))
+
+    async def summary(self, span, resolution):
+        """Rollups covering the last `span` seconds, plus the longest-stalled torrents"""
+        return await self._run(self._summary, int(time.time()), span, resolution)
+
+    def _summary(self, now, span, resolution):
+        db = self._connect()
+        start = now - span
+        rows = db.execute("""
+            SELECT bucket, samples, dl_sum, dl_max, up_sum, up_max FROM global_rollups
+            WHERE resolution = ? AND bucket >= ? ORDER BY bucket
+        """, (resolution, start - start % resolution)).fetchall()
+        stalled = db.execute("""
+            SELECT name, instance, since FROM torrent_states
+            WHERE status = ? ORDER BY since LIMIT 5
+        """, (Status.STALLED,)).fetchall()
+        top = db.execute("""
+            SELECT s.name, s.instance, SUM(r.dl_sum) * 1.0 / SUM(r.samples) AS avg_dl
+            FROM torrent_rollups r JOIN torrent_states s USING (instance, hash)
+            WHERE r.resolution = ? AND r.bucket >= ?
+            GROUP BY r.instance, r.hash ORDER BY avg_dl DESC LIMIT 5
+        """, (resolution, start - start % resolution)).fetchall()
+        return rows, stalled, top
+
+    @staticmethod
+    def sparkline(values, width=48):
+        """Squeeze `values` into at most `width` bar characters"""
+        if not values:
+            return ""
+        if len(values) > width:
+            step = len(values) / width
+            values = [
+                max(values[int(i * step):int((i + 1) * step)] or [0])
+                for i in range(width)
+            ]
+        bars = "▁▂▃▄▅▆▇█"
+        peak = max(values) or 1
+        return "".join(bars[min(len(bars) - 1, int(v / peak * (len(bars) - 1) + 0.5))] for v in values)
+
+    async def close(self):
+        # Close on the SQLite thread, after any write still queued there, without blocking the loop
+        try:
+            await self._run(self._close)
+        finally:
+            self.executor.shutdown(wait=False)
+
+    def _close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+class NameIndex:
+    """Word index over torrent names, kept current from sync deltas
+
+    Torrents are indexed by the words in their names, and the word vocabulary
+    by trigrams, so a query word finds every name word containing it without
+    scanning the library. Real libraries share most words (1080p, x264, S01),
+    which keeps the trigram side small.
+    """
+
+    def __init__(self):
+        self.entries = {}  # (instance, hash) -> (record, words)
+        self.postings = {}  # word -> keys of the torrents whose name contains it
+        self.trigrams = {}  # trigram -> vocabulary words containing it
+
+    @staticmethod
+    def tokenize(text):
+        return re.findall(r'[a-z0-9]+', text.lower())
+
+    @staticmethod
+    def trigrams_of(word):
+        # Padding marks word starts and ends, so short words get trigrams too
+        padded = f" {word} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def add(self, record):
+        key = (record.instance, record.hash)
+        self._remove_key(key)
+        words = set(self.tokenize(record.name))
+        for word in words:
+            keys = self.postings.get(word)
+            if keys is None:
+                keys = self.postings[word] = set()
+                for trigram in self.trigrams_of(word):
+                    self.trigrams.setdefault(trigram, set()).add(word)
+            keys.add(key)
+        self.entries[key] = (record, words)
+
+    def remove(self, record):
+        self._remove_key((record.instance, record.hash))
+
+    def _remove_key(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for word in entry[1]:
+            keys = self.postings[word]
+            keys.discard(key)
+            if keys:
+                continue
+            # Last torrent using this word, drop it from the vocabulary
+            del self.postings[word]
+            for trigram in self.trigrams_of(word):
+                words = self.trigrams[trigram]
+                words.discard(word)
+                if not words:
+                    del self.trigrams[trigram]
+
+    def rebuild(self, records):
+        self.entries, self.postings, self.trigrams = {}, {}, {}
+        for record in records:
+            self.add(record)
+
+    def handle(self, manager, delta):
+        """TorrentManager listener: index only what the delta touched"""
+        for record in delta.added:
+            self.add(record)
+        for record, before in delta.renamed:
+            self.add(record)
+        for record in delta.removed:
+            self.remove(record)
+
+    def _vocabulary_matches(self, term):
+        """Vocabulary words containing `term`"""
+        if len(term) == 1:
+            return {term} if term in self.postings else set()
+        if len(term) == 2:
+            # Too short for a trigram of its own, match words starting with it
+            return set(self.trigrams.get(f" {term}", ()))
+        candidates = [self.trigrams.get(term[i:i + 3]) for i in range(len(term) - 2)]
+        if not all(candidates):
+            return set()
+        candidates.sort(key=len)
+        return {word for word in candidates[0].intersection(*candidates[1:]) if term in word}
+
+    def _term_scores(self, term):
+        """Score per torrent key for one query term: exact word 3, prefix 2, substring 1"""
+        scores = {}
+        for word in self._vocabulary_matches(term):
+            score = 3 if word == term else 2 if word.startswith(term) else 1
+            for key in self.postings[word]:
+                if scores.get(key, 0) < score:
+                    scores[key] = score
+        return scores
+
+    def search(self, query, limit=None, predicate=None):
+        """Records whose names contain every query term, best first
+
+        Returns the top `limit` matches and how many matched in total.
+        """
+        terms = set(self.tokenize(query))
+        if not terms:
+            return [], 0
+
+        totals = None
+        for scores in sorted((self._term_scores(term) for term in terms), key=len):
+            if totals is None:
+                totals = scores
+            else:
+                totals = {key: total + scores[key] for key, total in totals.items() if key in scores}
+            if not totals:
+                return [], 0
+
+        scored = []
+        for key, total in totals.items():
+            record = self.entries[key][0]
+            if predicate is None or predicate(record):
+                # Better score first, then shorter (more specific) names
+                scored.append((-total, len(record.name), key))
+
+        ranked = heapq.nsmallest(limit, scored) if limit is not None else sorted(scored)
+        return [self.entries[key][0] for _, _, key in ranked], len(scored)
+
+class RefreshScheduler:
+    """Pick the next auto-update interval from what the last refresh saw"""
+
+    def __init__(self, base, minimum, maximum, pushed=False):
+        self.base = base
+        self.minimum = minimum
+        self.maximum = maximum
+        self.interval = base
+        # With qBittorrent pushing add/finish events, an idle library needs no ramp
+        self.pushed = pushed
+
+    def next_interval(self, active, changed):
+        if active:
+            # Something is downloading: keep the numbers fresh
+            self.interval = self.minimum
+        elif changed:
+            self.interval = self.base
+        elif self.pushed:
+            self.interval = self.maximum
+        else:
+            # Idle and unchanged: back off exponentially
+            self.interval = min(max(self.interval, self.minimum) * 2, self.maximum)
+        return self.interval
+
+class OutboxJob:
+    __slots__ = ('func', 'args', 'kwargs', 'bucket', 'priority', 'seq', 'collapse_key', 'enqueued', 'future')
+
+class DiscordOutbox:
+    """Central queue for the bot's Discord writes
+
+    Calls are paced per route bucket, a pending edit of a message is replaced
+    by a newer edit of the same message, and user-initiated work is served
+    before background refreshes.
+    """
+    USER = 0
+    BACKGROUND = 1
+
+    # (calls, per seconds) for each bucket kind, after Discord's per-channel limits
+    LIMITS = {
+        'send': (5, 5.0),
+        'edit': (5, 5.0),
+        'delete': (5, 1.0),
+    }
+
+    def __init__(self):
+        self.jobs = []  # Pending jobs
+        self.collapsible = {}  # collapse key -> pending job
+        self.buckets = {}  # (kind, channel id) -> [tokens, last refill time]
+        self.busy = set()  # Buckets with a call in flight
+        self.wakeup = asyncio.Event()
+        self.worker = None
+        self.in_flight = set()  # Tasks running a call, kept referenced until they finish
+        self.seq = 0
+
+        # Stats
+        self.calls = 0
+        self.collapsed = 0
+        self.rate_limited = 0
+        self.last_wait = 0.0
+        self.max_wait = 0.0
+        self.total_wait = 0.0
+
+    @property
+    def depth(self):
+        return len(self.jobs)
+
+    def stats(self):
+        return {
+            'depth': self.depth,
+            'calls': self.calls,
+            'collapsed': self.collapsed,
+            'rate_limited': self.rate_limited,
+            'last_wait': self.last_wait,
+            'max_wait': self.max_wait,
+            'avg_wait': self.total_wait / self.calls if self.calls else 0.0,
+        }
+
+    async def send(self, channel, priority=USER, **kwargs):
+        return await self._enqueue(channel.send, ('send', channel.id), priority, None, **kwargs)
+
+    async def edit(self, message, priority=USER, **kwargs):
+        # Only the latest edit of a message matters
+        return await self._enqueue(message.edit, ('edit', message.channel.id), priority,
+                                   ('edit', message.id), **kwargs)
+
+    async def delete(self, message, priority=USER):
+        return await self._enqueue(message.delete, ('delete', message.channel.id), priority,
+                                   ('delete', message.id))
+
+    async def delete_messages(self, channel, messages, priority=USER):
+        return await self._enqueue(channel.delete_messages, ('delete', channel.id), priority, None, messages)
+
+    async def _enqueue(self, func, bucket, priority, collapse_key, *args, **kwargs):
+        if collapse_key is not None:
+            pending = self.collapsible.get(collapse_key)
+            if pending is not None:
+                # Supersede the queued call; its callers get this call's result
+                pending.func, pending.args, pending.kwargs = func, args, kwargs
+                pending.priority = min(pending.priority, priority)
+                self.collapsed += 1
+                return await asyncio.shield(pending.future)
+
+        loop = asyncio.get_running_loop()
+        job = OutboxJob()
+        job.func, job.args, job.kwargs = func, args, kwargs
+        job.bucket = bucket
+        job.priority = priority
+        job.seq = self.seq = self.seq + 1
+        job.collapse_key = collapse_key
+        job.enqueued = loop.time()
+        job.future = loop.create_future()
+        self.jobs.append(job)
+        if collapse_key is not None:
+            self.collapsible[collapse_key] = job
+
+        if self.worker is None or self.worker.done():
+            self.worker = asyncio.ensure_future(self._run())
+        self.wakeup.set()
+        return await asyncio.shield(job.future)
+
+    def _ready_at(self, bucket, now):
+        """Loop time at which `bucket` has a call available"""
+        calls, period = self.LIMITS[bucket[0]]
+        tokens, last = self.buckets.get(bucket, (calls, now))
+        tokens = min(calls, tokens + (now - last) * calls / period)
+        self.buckets[bucket] = [tokens, now]
+        return now if tokens >= 1 else now + (1 - tokens) * period / calls
+
+    def _pick(self, now):
+        """Take the most urgent job whose bucket is free, or say how long to wait"""
+        best = None
+        next_ready = None
+        for job in self.jobs:
+            if job.bucket in self.busy:
+                continue
+            ready = self._ready_at(job.bucket, now)
+            if ready > now:
+                next_ready = ready if next_ready is None else min(next_ready, ready)
+            elif best is None or (job.priority, job.seq) < (best.priority, best.seq):
+                best = job
+
+        if best is None:
+            return None, (None if next_ready is None else next_ready - now)
+
+        self.jobs.remove(best)
+        if best.collapse_key is not None:
+            self.collapsible.pop(best.collapse_key, None)
+        self.buckets[best.bucket][0] -= 1
+        return best, 0
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self.wakeup.clear()
+            job, delay = self._pick(loop.time())
+            if job is None:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self.busy.add(job.bucket)
+            task = asyncio.ensure_future(self._execute(job))
+            self.in_flight.add(task)
+            task.add_done_callback(self.in_flight.discard)
+
+    def close(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker = None
+        for task in list(self.in_flight):
+            task.cancel()
+        # Nobody will run what is still queued; don't leave its callers waiting
+        for job in self.jobs:
+            job.future.cancel()
+        self.jobs = []
+        self.collapsible = {}
+
+    @staticmethod
+    def _retry_after(error):
+        """Seconds Discord asked us to back off for, if `error` is a rate limit
+
+        discord.py waits out ordinary 429s itself. Only what escapes it gets
+        here: a 429 that outlasted its retries, or a wait longer than the
+        client's max_ratelimit_timeout.
+        """
+        if isinstance(error, discord.RateLimited):
+            return error.retry_after
+        if isinstance(error, discord.HTTPException) and error.status == 429:
+            headers = getattr(error.response, 'headers', None) or {}
+            try:
+                return float(headers.get('Retry-After', 1))
+            except (TypeError, ValueError):
+                return 1.0
+        return None
+
+    async def _execute(self, job):
+        loop = asyncio.get_running_loop()
+        wait = loop.time() - job.enqueued
+        self.calls += 1
+        self.last_wait = wait
+        self.max_wait = max(self.max_wait, wait)
+        self.total_wait += wait
+        metrics.observe('discord_queue_wait_seconds', wait)
+        started = time.perf_counter()
+        try:
+            result = await job.func(*job.args, **job.kwargs)
+        except asyncio.CancelledError:
+            job.future.cancel()
+            raise
+        except Exception as e:
+            retry_after = self._retry_after(e)
+            if retry_after is not None:
+                # Empty the bucket for as long as Discord asks
+                self.rate_limited += 1
+                metrics.inc('discord_rate_limited_total', kind=job.bucket[0])
+                calls, period = self.LIMITS[job.bucket[0]]
+                self.buckets[job.bucket] = [-retry_after * calls / period, loop.time()]
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            metrics.observe('discord_call_seconds', time.perf_counter() - started, kind=job.bucket[0])
+            self.busy.discard(job.bucket)
+            self.wakeup.set()
+
+class StateStore:
+    """What the bot needs to pick up where it left off, kept in a small JSON file
+
+    Saves are coalesced and written off the event loop, through a temporary
+    file and a rename so a crash never leaves half a file behind.
+    """
+
+    def __init__(self, path, delay=2.0):
+        self.path = path
+        self.delay = delay  # Seconds to gather changes before writing
+        self.dirty = False
+        self.task = None
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read state file {self.path}: {str(e)}")
+            return {}
+
+    def save_soon(self, snapshot):
+        """Write `snapshot()` shortly, once for any number of calls meanwhile"""
+        self.dirty = True
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self._save_later(snapshot))
+
+    async def _save_later(self, snapshot):
+        loop = asyncio.get_running_loop()
+        while self.dirty:
+            await asyncio.sleep(self.delay)
+            self.dirty = False
+            try:
+                await loop.run_in_executor(None, self._write, snapshot())
+            except OSError as e:
+                logger.error(f"Could not save state file {self.path}: {str(e)}")
+
+    def _write(self, data):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temp_path, self.path)
+
+    def close(self, data):
+        """Final save on shutdown"""
+        if self.task and not self.task.done():
+            self.task.cancel()
+        try:
+            self._write(data)
+        except OSError as e:
+            logger.error(f"Could not save state file {self.path}: {str(e)}")
+
+class LocalHttpServer:
+    """Small aiohttp listener for local endpoints such as /metrics and /hook"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.app = web.Application()
+        self.runner = None
+
+    def add_route(self, method, path, handler):
+        self.app.router.add_route(method, path, handler)
+
+    async def start(self):
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        logger.info(f"Listening on http://{self.host}:{self.port}")
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+class RenderCache:
+    """LRU of rendered text, reused while the fingerprint it was rendered from matches
+
+    Entries for torrents that are gone simply age out.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (fingerprint, text)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key, fingerprint):
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == fingerprint:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            metrics.inc('render_cache_total', result='hit')
+            return entry[1]
+        self.misses += 1
+        metrics.inc('render_cache_total', result='miss')
+        return None
+
+    def put(self, key, fingerprint, text):
+        self.entries[key] = (fingerprint, text)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+class TtlCache:
+    """LRU bounded by the total weight of its entries, which also expire after `ttl` seconds"""
+
+    def __init__(self, max_weight, ttl):
+        self.max_weight = max_weight
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires, weight, value)
+        self.weight = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[0]:
+            self._drop(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry[2]
+
+    def put(self, key, value, weight=1):
+        if key in self.entries:
+            self._drop(key)
+        if weight > self.max_weight:
+            return  # Would evict everything else for one lookup
+        self.entries[key] = (time.monotonic() + self.ttl, weight, value)
+        self.weight += weight
+        while self.weight > self.max_weight:
+            self._drop(next(iter(self.entries)))
+
+    def _drop(self, key):
+        _, weight, _ = self.entries.pop(key)
+        self.weight -= weight
+
+class StatusView:
+    """A subscribed status display: one channel, its filters and the message showing them"""
+
+    def __init__(self, channel, category="all", status_filter="all", mode="list"):
+        self.channel = channel
+        self.category = category  # User-friendly category, as typed
+        self.status_filter = status_filter
+        self.mode = mode  # "list" pages through torrents, "summary" shows totals
+        self.message = None  # The status message, once posted
+        self.hash = None  # Content hash of the message as last sent
+        self.page = 0
+        self.rows = []  # Matching torrents as of the last refresh, unordered
+        self.auto_refresh = True
+
+    @property
+    def key(self):
+        return (self.channel.id, self.category.lower(), self.status_filter.lower(), self.mode)
+
+    @property
+    def filter_key(self):
+        """What this view needs from the snapshot; views sharing it share a filter pass"""
+        return (Config.map_category(self.category), self.status_filter.lower())
+
+    @property
+    def pages(self):
+        if self.mode == "summary":
+            return 1
+        return max(1, -(-len(self.rows) // Config.PAGE_SIZE))
+
+class DetailsView(discord.ui.View):
+    """File page buttons under a `$details` message"""
+
+    def __init__(self, bot, torrent):
+        super().__init__(timeout=300)
+        self.bot = bot
+        self.torrent = torrent
+        self.page = 0
+
+    def update(self, pages):
+        self.previous_page.disabled = self.page <= 0
+        self.next_page.disabled = self.page >= pages - 1
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction, button):
+        await self.bot._turn_details_page(interaction, self, -1)
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction, button):
+        await self.bot._turn_details_page(interaction, self, 1)
+
+class ConfirmView(discord.ui.View):
+    """Confirm and cancel buttons that only the requesting user can press"""
+
+    def __init__(self, user_id, label, emoji=None, timeout=60):
+        super().__init__(timeout=timeout)
+        self.user_id = user_id
+        self.confirmed = False
+        self.confirm.label = label
+        if emoji:
+            self.confirm.emoji = emoji
+
+    async def interaction_check(self, interaction):
+        if interaction.user.id != self.user_id:
+            await interaction.response.send_message("❌ Only the person who asked can answer this.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(emoji="🗑️", label="Confirm", style=discord.ButtonStyle.danger)
+    async def confirm(self, interaction, button):
+        self.confirmed = True
+        await interaction.response.defer()
+        self.stop()
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction, button):
+        await interaction.response.defer()
+        self.stop()
+
+class StatusControls(discord.ui.View):
+    """Page and refresh controls under a status message
+
+    A fresh set is attached with every render, so buttons show the view's
+    current state. Clicks are looked up by message, not by this object.
+    """
+
+    def __init__(self, bot, page=0, pages=1, auto_refresh=True):
+        super().__init__(timeout=None)
+        self.bot = bot
+        self.previous_page.disabled = page <= 0
+        self.next_page.disabled = page >= pages - 1
+        self.toggle_refresh.emoji = "⏸️" if auto_refresh else "▶️"
+        self.toggle_refresh.label = "Pause" if auto_refresh else "Resume"
+        if pages > 1:
+            self.jump.options = [
+                discord.SelectOption(label=f"Page {choice + 1} of {pages}", value=str(choice), default=choice == page)
+                for choice in self.page_choices(page, pages)
+            ]
+        else:
+            self.remove_item(self.jump)
+
+    @classmethod
+    def for_dispatch(cls, bot):
+        """Every control, page picker included, for routing clicks on a message we haven't rendered yet"""
+        return cls(bot, page=0, pages=2)
+
+    @staticmethod
+    def page_choices(page, pages):
+        """Pages to offer in the picker: the current neighbourhood plus landmarks across the rest"""
+        nearby = range(max(0, page - 5), min(pages, page + 6))
+        landmarks = {round(i * (pages - 1) / 12) for i in range(13)}
+        return sorted(set(nearby) | landmarks)[:25]  # Discord's option limit
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.secondary, custom_id="qbitbot:status:previous")
+    async def previous_page(self, interaction, button):
+        await self.bot._handle_control(interaction, "previous")
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.secondary, custom_id="qbitbot:status:next")
+    async def next_page(self, interaction, button):
+        await self.bot._handle_control(interaction, "next")
+
+    @discord.ui.button(emoji="🔄", label="Refresh", style=discord.ButtonStyle.primary, custom_id="qbitbot:status:refresh")
+    async def refresh(self, interaction, button):
+        await self.bot._handle_control(interaction, "refresh")
+
+    @discord.ui.button(emoji="⏸️", label="Pause", style=discord.ButtonStyle.secondary, custom_id="qbitbot:status:toggle")
+    async def toggle_refresh(self, interaction, button):
+        await self.bot._handle_control(interaction, "toggle")
+
+    @discord.ui.button(emoji="✖️", label="Close", style=discord.ButtonStyle.danger, custom_id="qbitbot:status:close")
+    async def close(self, interaction, button):
+        await self.bot._handle_control(interaction, "close")
+
+    @discord.ui.select(placeholder="Jump to page…", custom_id="qbitbot:status:page",
+                       options=[discord.SelectOption(label="Page 1", value="0")])
+    async def jump(self, interaction, select):
+        await self.bot._handle_control(interaction, "page", int(select.values[0]))
+
+class DiscordBot(commands.Bot):
+    HASH_PATTERN = re.compile(r'[0-9a-f]{40}|[0-9a-f]{64}')  # v1 or v2 torrent hash
+
+    def __init__(self):
+        # Load configuration
+        config = Config.load_env()
+
+        intents = discord.Intents.default()
+        intents.message_content = config['PREFIX_COMMANDS']
+        super().__init__(
+            command_prefix='$',
+            intents=intents,
+            # Controls are matched by message ID, so only a small cache is kept
+            max_messages=config['MESSAGE_CACHE'],
+            help_command=commands.DefaultHelpCommand(
+                no_category="Available Commands",
+                width=120,
+                sort_commands=False
+            )
+        )
+        self.config = config
+        
+        # Initialize one qBittorrent client per backend, merged into one torrent source
+        self.torrent_manager = TorrentFederation([
+            TorrentManager(
+                AsyncQbitClient(
+                    self._setup_qbit_client(instance),
+                    max_workers=self.config['QBIT_WORKERS'],
+                    timeout=instance['timeout'],
+                    name=instance['name']
+                ),
+                instance['name']
+            )
+            for instance in self.config['QBIT_INSTANCES']
+        ])
+
+        # qBittorrent's run-on-add/finish hook, when a port and token are set
+        self.hook_enabled = bool(self.config['HOOK_PORT'] and self.config['HOOK_TOKEN'])
+        if self.config['HOOK_PORT'] and not self.config['HOOK_TOKEN']:
+            logger.error("HOOK_PORT is set without HOOK_TOKEN; the hook listener stays off")
+        self.hook_hashes = set()  # (instance or None, hash) pings waiting for the next hook refresh
+        self.hook_task = None
+
+        # Status update tracking
+        self.status_views = {}  # (channel id, category, status filter, mode) -> StatusView
+        self.auto_update_task = None
+        self.scheduler = RefreshScheduler(
+            self.config['REFRESH_INTERVAL'],
+            self.config['REFRESH_MIN_INTERVAL'],
+            self.config['REFRESH_MAX_INTERVAL'],
+            pushed=self.hook_enabled
+        )
+        self.next_refresh_due = 0  # Event loop time of the next auto-update
+        self.refresh_wakeup = asyncio.Event()  # Set when the due time moves
+
+        # Refresh coalescing: views waiting for the next fetch, and the fetch in flight
+        self.pending_refresh = {}  # view key -> StatusView
+        self.pending_background = True
+        self.refresh_task = None
+
+        # Every Discord write goes through here
+        self.outbox = DiscordOutbox()
+
+        # Completion/stall notifications, when channels are configured for them
+        self.events = None
+        if self.config['NOTIFY_CHANNELS']:
+            self.events = TorrentEventEngine(
+                self,
+                self.config['NOTIFY_CHANNELS'],
+                self.config['NOTIFY_EVENTS'],
+                debounce=self.config['NOTIFY_DEBOUNCE'],
+                max_delay=self.config['NOTIFY_MAX_DELAY']
+            )
+            self.torrent_manager.add_listener(self.events.handle)
+
+        # Hot-path metrics, served on a local Prometheus endpoint when a port is set
+        metrics.enabled = self.config['METRICS_ENABLED']
+        self.last_auto_update = None  # Wall time the auto-update loop last finished a pass
+        metrics.gauge_function('outbox_queue_depth', lambda: self.outbox.depth)
+        metrics.gauge_function('auto_update_age_seconds',
+                               lambda: time.time() - self.last_auto_update if self.last_auto_update else -1)
+        self.http_servers = {}  # (host, port) -> LocalHttpServer, shared when endpoints share a port
+        if self.config['METRICS_PORT']:
+            self._http_server(self.config['METRICS_HOST'], self.config['METRICS_PORT']).add_route(
+                'GET', '/metrics', self._serve_metrics)
+        if self.hook_enabled:
+            self._http_server(self.config['HOOK_HOST'], self.config['HOOK_PORT']).add_route(
+                'POST', '/hook', self._serve_hook)
+
+        # Rendered rows, reused until the torrent's visible fields change
+        self.render_cache = RenderCache(Config.RENDER_CACHE_SIZE)
+        metrics.gauge_function('render_cache_entries', lambda: len(self.render_cache.entries))
+
+        # Recent `$details` fetches, so paging and repeat lookups don't refetch
+        self.details_cache = TtlCache(Config.DETAILS_CACHE_FILES, Config.DETAILS_TTL)
+
+        # Torrent name search, built on first use
+        self.name_index = None
+        self.index_lock = asyncio.Lock()  # One build at a time; others wait for it
+
+        # Transfer history for $stats
+        self.stats_store = None
+        if self.config['STATS_DB']:
+            self.stats_store = StatsStore(self.config['STATS_DB'])
+            self.torrent_manager.add_listener(self.stats_store.handle)
+
+        # Status views, refresh state and our message IDs, carried across restarts
+        self.state_store = StateStore(self.config['STATE_FILE']) if self.config['STATE_FILE'] else None
+        self.saved_state = self.state_store.load() if self.state_store else {}
+        self.tracked_messages = {  # channel id -> IDs of our own and command messages, oldest first
+            int(channel_id): deque(ids, maxlen=Config.TRACKED_MESSAGES)
+            for channel_id, ids in self.saved_state.get('tracked_messages', {}).items()
+        }
+        self.commands_digest = self.saved_state.get('commands_digest')  # Slash commands as last synced
+        if self.saved_state.get('refresh_interval'):
+            self.scheduler.interval = min(self.scheduler.maximum,
+                                          max(self.scheduler.minimum, self.saved_state['refresh_interval']))
+
+        # Register commands
+        self.add_commands()
+
+    def _is_status_channel(self, channel):
+        return str(channel.id) in self.config['BOT_CHANNELS']
+
+    def _view_for_message(self, message):
+        """Find the status view showing `message`"""
+        for view in self.status_views.values():
+            if view.message and view.message.id == message.id:
+                return view
+        return None
+
+    def _http_server(self, host, port):
+        key = (host, port)
+        if key not in self.http_servers:
+            self.http_servers[key] = LocalHttpServer(host, port)
+        return self.http_servers[key]
+
+    def _setup_qbit_client(self, instance):
+        # One pooled requests session per backend, shared by its worker threads
+        return qbittorrentapi.Client(
+            host=instance['host'],
+            port=instance['port'],
+            username=instance['username'],
+            password=instance['password'],
+            REQUESTS_ARGS={'timeout': instance['timeout']},
+            HTTPADAPTER_ARGS={
+                'pool_connections': 1,
+                'pool_maxsize': self.config['QBIT_WORKERS']
+            }
+        )
+
+    async def setup_hook(self):
+        # Log in before connecting to Discord without blocking the event loop
+        await self.torrent_manager.login()
+
+        for server in self.http_servers.values():
+            await server.start()
+
+        await self._sync_commands()
+
+    def _commands_digest(self):
+        """Hash of what the slash command definitions tell Discord
+
+        Built from the commands' public attributes rather than `to_dict`,
+        whose signature changed between discord.py 2.x releases.
+        """
+        payload = sorted(
+            [command.name, command.description, [
+                [p.name, p.description, p.type.value, p.required, p.autocomplete,
+                 [[choice.name, choice.value] for choice in p.choices]]
+                for p in command.parameters
+            ]]
+            for command in self.tree.get_commands()
+        )
+        return hashlib.sha256(json.dumps(payload).encode()).hexdigest()
+
+    async def _sync_commands(self):
+        """Register /status and /find with Discord, only when they changed
+
+        Global syncs are rate limited, so the last synced definitions are
+        remembered in the state file instead of syncing on every start.
+        """
+        digest = self._commands_digest()
+        if not self.config['SYNC_COMMANDS']:
+            if digest == self.commands_digest:
+                return
+            if not self.state_store:
+                logger.info("Slash commands not synced: without STATE_FILE, set SYNC_COMMANDS=true when they change")
+                return
+        try:
+            await self.tree.sync()
+        except discord.HTTPException as e:
+            logger.error(f"Could not sync slash commands: {str(e)}")
+            return
+        logger.info("Synced slash commands", extra={'event': 'commands_synced'})
+        self.commands_digest = digest
+        self._save_state()
+
+    async def _serve_metrics(self, request):
+        return web.Response(text=metrics.render(), content_type='text/plain', charset='utf-8')
+
+    async def _serve_hook(self, request):
+        """Take a ping from qbit_hook.py and queue a refresh of the torrents it names"""
+        params = dict(request.query)
+        if request.can_read_body:
+            params.update(await request.post())
+        # Header only: a token in the URL would end up in access logs and shell history
+        token = request.headers.get('X-Hook-Token', '')
+        if not hmac.compare_digest(token.encode(), self.config['HOOK_TOKEN'].encode()):
+            logger.warning(f"Rejected hook ping from {request.remote}: bad token",
+                           extra={'event': 'hook_rejected', 'sample': 'hook_rejected'})
+            return web.Response(status=401, text='Unauthorized')
+
+        hashes = {h.strip().lower() for h in params.get('hash', '').split('|') if h.strip()}
+        instance = params.get('instance') or None
+        if not hashes or not all(self.HASH_PATTERN.fullmatch(h) for h in hashes):
+            return web.Response(status=400, text='Expected hash=<torrent hash>')
+        if instance is not None and instance not in self.torrent_manager.managers:
+            return web.Response(status=400, text=f'Unknown instance {instance}')
+
+        event = params.get('event', '')
+        metrics.inc('hook_pings_total', event=event if event in ('added', 'finished') else 'other')
+        logger.info(f"Hook ping: {event or 'event'} for {', '.join(sorted(hashes))}",
+                    extra={'event': 'hook_ping', 'hook_event': event, 'hashes': sorted(hashes), 'instance': instance,
+                           'sample': 'hook_ping'})
+        self.hook_hashes.update((instance, h) for h in hashes)
+        if self.hook_task is None or self.hook_task.done():
+            self.hook_task = asyncio.ensure_future(self._run_hook_refresh())
+        return web.Response(status=202, text='Queued')
+
+    async def _run_hook_refresh(self):
+        """Refresh just the torrents named by hook pings, once each burst of pings is over"""
+        while self.hook_hashes:
+            await asyncio.sleep(self.config['HOOK_DEBOUNCE'])
+            pings, self.hook_hashes = self.hook_hashes, set()
+            try:
+                await self._apply_hook_pings(pings)
+            except Exception as e:
+                logger.error(f"Hook refresh error: {str(e)}")
+
+    async def _apply_hook_pings(self, pings):
+        by_instance = {}
+        for instance, torrent_hash in pings:
+            by_instance.setdefault(instance, set()).add(torrent_hash)
+        fresh = []
+        for instance, hashes in by_instance.items():
+            fresh.extend(await self.torrent_manager.fetch_hashes(hashes, instance))
+
+        for view in list(self.status_views.values()):
+            if view.auto_refresh and self._patch_rows(view, fresh):
+                await self._update_status_message(view)
+
+        # A new download needs the regular refresh for its progress; pull that forward
+        if any(torrent.status != Status.COMPLETED for torrent in fresh):
+            due = asyncio.get_running_loop().time() + self.scheduler.minimum
+            if due < self.next_refresh_due:
+                self.scheduler.interval = self.scheduler.minimum
+                self.next_refresh_due = due
+                self.refresh_wakeup.set()
+
+    async def close(self):
+        # Send batched notifications while the connection is still up
+        if self.events:
+            try:
+                await asyncio.wait_for(self.events.flush(), 10)
+            except Exception as e:
+                logger.error(f"Error sending notifications at shutdown: {str(e)}")
+        await super().close()
+        if self.state_store:
+            self.state_store.close(self._state_snapshot())
+        if self.hook_task and not self.hook_task.done():
+            self.hook_task.cancel()
+        for server in self.http_servers.values():
+            await server.stop()
+        self.outbox.close()
+        self.torrent_manager.close()
+        if self.stats_store:
+            await self.stats_store.close()
+
+    async def on_message(self, message):
+        self._track_message(message)
+        await self.process_commands(message)
+
+    def _track_message(self, message):
+        # Remember our own and command messages in status channels, so cleanup deletes just those
+        if not self._is_status_channel(message.channel):
+            return
+        if message.author == self.user or message.content.startswith(self.command_prefix):
+            tracked = self.tracked_messages.setdefault(message.channel.id, deque(maxlen=Config.TRACKED_MESSAGES))
+            tracked.append(message.id)
+            self._save_state()
+
+    def _state_snapshot(self):
+        return {
+            'views': [
+                {
+                    'channel_id': view.channel.id,
+                    'category': view.category,
+                    'status_filter': view.status_filter,
+                    'mode': view.mode,
+                    'message_id': view.message.id if view.message else None,
+                    'page': view.page,
+                    'auto_refresh': view.auto_refresh,
+                }
+                for view in self.status_views.values()
+            ],
+            'refresh_interval': self.scheduler.interval,
+            'commands_digest': self.commands_digest,
+            'tracked_messages': {str(channel_id): list(ids) for channel_id, ids in self.tracked_messages.items()},
+        }
+
+    def _save_state(self):
+        if self.state_store:
+            self.state_store.save_soon(self._state_snapshot)
+
+    def _restore_views(self):
+        """Pick the saved status views back up, editing their messages instead of reposting"""
+        restored = 0
+        for saved in self.saved_state.get('views', []):
+            channel = self.get_channel(saved['channel_id'])
+            if channel is None or not self._is_status_channel(channel):
+                continue
+            view = StatusView(channel, saved['category'], saved['status_filter'], saved.get('mode', 'list'))
+            view.page = saved.get('page', 0)
+            view.auto_refresh = saved.get('auto_refresh', True)
+            if saved.get('message_id'):
+                # No API call; a message deleted meanwhile retires the view on the first refresh
+                view.message = channel.get_partial_message(saved['message_id'])
+                # Its buttons and page picker answer before the first refresh re-attaches them
+                self.add_view(StatusControls.for_dispatch(self), message_id=view.message.id)
+            self.status_views[view.key] = view
+            restored += 1
+        if restored:
+            logger.info(f"Resumed {restored} status {'view' if restored == 1 else 'views'}",
+                        extra={'event': 'resume', 'views': restored})
+
+    def _log_command(self, ctx, command_name, args=None, sample=None):
+        """Log command usage with user details, for `$` commands and slash command interactions"""
+        slash = isinstance(ctx, discord.Interaction)
+        user = ctx.user if slash else ctx.author
+        guild = ctx.guild
+        channel = ctx.channel
+        
+        # Format the command and its arguments
+        command_str = f"{'/' if slash else '$'}{command_name}"
+        if args:
+            command_str += f" {' '.join(str(arg) for arg in args)}"
+        
+        # Create a visually distinct console banner, when wanted
+        if self.config['LOG_BANNERS']:
+            banner_logger.info(
+                f"\n{'='*50}\n"
+                f"Command executed by: {user.name}#{user.discriminator} (ID: {user.id})\n"
+                f"Server: {guild.name} (ID: {guild.id})\n"
+                f"Channel: #{channel.name} (ID: {channel.id})\n"
+                f"Command: {command_str}\n"
+                f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"{'='*50}"
+            )
+
+        extra = {'event': 'command', 'command': command_str, 'user': f"{user.name}#{user.discriminator}",
+                 'user_id': user.id, 'guild_id': guild.id, 'channel_id': channel.id}
+        if sample:
+            extra['sample'] = sample
+        logger.info(f"Command executed: {command_str} by {user.name}#{user.discriminator}", extra=extra)
+
+    def _log_control(self, interaction, action):
+        """Log status control clicks with user details"""
+        user = interaction.user
+        message = interaction.message
+
+        # Create a visually distinct console banner, when wanted
+        if self.config['LOG_BANNERS']:
+            banner_logger.info(
+                f"\n{'='*50}\n"
+                f"Control used by: {user.name}#{user.discriminator} (ID: {user.id})\n"
+                f"Server: {message.guild.name} (ID: {message.guild.id})\n"
+                f"Channel: #{message.channel.name} (ID: {message.channel.id})\n"
+                f"Control: {action}\n"
+                f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"{'='*50}"
+            )
+
+        # Page flipping comes in bursts, keep the log readable
+        logger.info(f"Control used: {action} by {user.name}#{user.discriminator}",
+                    extra={'event': 'control', 'control': action, 'user': f"{user.name}#{user.discriminator}",
+                           'user_id': user.id, 'channel_id': message.channel.id, 'sample': 'control'})
+
+    def add_commands(self):
+        control_help = """
+🎛️ **Pick torrents like `$status` does, then add name words if you like:**
+
+`$%s tv stalled` - Every stalled TV torrent
+`$%s movies matrix` - Movies with "matrix" in the name
+`$%s all downloading` - Everything still downloading
+`$%s all` - Every torrent; with no words at all nothing happens
+
+🔒 Needs the Manage Server permission or a role listed in `CONTROL_ROLE`.
+"""
+        @self.event
+        async def on_ready():
+            if self.config['LOG_BANNERS']:
+                banner_logger.info(
+                    f"\n{'='*50}\n"
+                    f"Bot is ready!\n"
+                    f"Logged in as: {self.user.name} (ID: {self.user.id})\n"
+                    f"Connected to {len(self.guilds)} servers\n"
+                    f"Monitoring channel IDs: {', '.join(sorted(self.config['BOT_CHANNELS']))}\n"
+                    f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                    f"{'='*50}"
+                )
+            logger.info(f'Bot is ready: {self.user.name} ({self.user.id})',
+                        extra={'event': 'ready', 'guilds': len(self.guilds)})
+            hint = "Type $help for commands! 🤖" if self.config['PREFIX_COMMANDS'] else "Type /status to start! 🤖"
+            await self.change_presence(activity=discord.Game(name=hint))
+            
+            # Start the auto-update task, picking up where the last run left off
+            if self.auto_update_task is None:
+                self._restore_views()
+                self.auto_update_task = self.loop.create_task(self._auto_update_status())
+
+        @self.event
+        async def on_command_error(ctx, error):
+            if isinstance(error, commands.errors.CommandNotFound):
+                await self.outbox.send(ctx.channel, content=f"❌ Unknown command. Type `$help` to see available commands!")
+                self._log_command(ctx, ctx.message.content, ["ERROR: Command not found"], sample='unknown_command')
+            else:
+                await self.outbox.send(ctx.channel, content=f"❌ An error occurred: {str(error)}")
+                self._log_command(ctx, ctx.message.content, [f"ERROR: {str(error)}"])
+
+        @self.command(name='status', 
+                     brief="📥 Check your torrent downloads (Auto-updates, faster while downloading)",
+                     help="""
+🔍 **How to use the status command:**
+
+1️⃣ Basic Usage:
+   `$status` - Shows all your torrents
+
+2️⃣ Filter by Category:
+   `$status movies` - Shows only movie torrents
+   `$status tv` - Shows only TV show torrents
+
+3️⃣ Filter by Status:
+   `$status completed` - Shows finished downloads
+   `$status downloading` - Shows active downloads
+   `$status stalled` - Shows downloads that are stuck
+
+4️⃣ Combine Filters:
+   `$status movies completed` - Shows finished movie downloads
+   `$status tv downloading` - Shows TV shows currently downloading
+
+5️⃣ Dashboard:
+   `$status summary` - Totals only: counts, speed, what's left and the fastest torrents
+   `$status summary movies downloading` - Filters work here too
+
+💡 **Tips:**
+• Status automatically updates every few minutes, and more often while something is downloading
+• Browse pages with the ◀️ ▶️ buttons or the page picker under the status
+• Press 🔄 to refresh right away, ⏸️ to pause auto-refresh
+• Use `$status all` to see everything
+• Downloads are automatically sorted by progress
+• Each torrent shows:
+  - Name
+  - Progress percentage
+  - Download speed
+  - Estimated time remaining
+  - File size
+
+❓ Need more help? Just type `$help` for all commands!
+""")
+        async def status(ctx, *args):
+            # Log the command
+            self._log_command(ctx, "status", args)
+
+            if not self._is_status_channel(ctx.channel):
+                await self.outbox.send(ctx.channel, content="❌ Oops! I can only respond to commands in the designated download status channel!")
+                return
+
+            parsed = self._parse_status_args(args)
+            if parsed is None:
+                await self.outbox.send(ctx.channel, content=(
+                    f"❌ I didn't understand `{' '.join(args)}`. "
+                    f"Try `$status [summary] [category] [{'|'.join(Config.STATUS_FILTERS[1:])}]`, e.g. `$status tv stalled`."
+                ))
+                return
+            mode, category, status_filter = parsed
+
+            try:
+                await self._open_status(ctx.channel, category, status_filter, mode)
+
+            except Exception as e:
+                logger.error(f"Error in status command: {str(e)}")
+                embed = discord.Embed(
+                    title="❌ Error",
+                    description=f"Oops! Something went wrong: {str(e)}\nPlease try again later or contact the admin if this persists.",
+                    color=discord.Color.red()
+                )
+                await self.outbox.send(ctx.channel, embed=embed)
+
+        @self.command(name='find',
+                     brief="🔎 Find torrents by name",
+                     help="""
+🔎 **How to use the find command:**
+
+`$find matrix` - Torrents whose name contains "matrix"
+`$find the office s03` - Every word must appear in the name
+`$find movies matrix` - Only movie torrents
+`$find tv downloading office` - Only TV shows still downloading
+
+💡 Category and status filters work just like in `$status` and go before the search words.
+""")
+        async def find(ctx, *args):
+            # Log the command
+            self._log_command(ctx, "find", args)
+
+            if not self._is_status_channel(ctx.channel):
+                await self.outbox.send(ctx.channel, content="❌ Oops! I can only respond to commands in the designated download status channel!")
+                return
+
+            try:
+                category, status_filter, words = self._parse_filters(args)
+                query = " ".join(words)
+                if not query:
+                    await self.outbox.send(ctx.channel, content="❌ What should I look for? Try `$find matrix`.")
+                    return
+                index = await self._ensure_index()
+
+                await self.outbox.send(ctx.channel, embed=self._find_embed(index, query, category, status_filter))
+
+            except Exception as e:
+                logger.error(f"Error in find command: {str(e)}")
+                embed = discord.Embed(
+                    title="❌ Error",
+                    description=f"Oops! Something went wrong: {str(e)}\nPlease try again later or contact the admin if this persists.",
+                    color=discord.Color.red()
+                )
+                await self.outbox.send(ctx.channel, embed=embed)
+
+        @self.tree.command(name='status', description="📥 Show torrents here, kept up to date automatically")
+        @app_commands.describe(category="Category, e.g. movies or tv", status="completed, downloading or stalled",
+                               summary="Show totals instead of the torrent list")
+        @app_commands.autocomplete(category=self._complete_category, status=self._complete_status)
+        async def slash_status(interaction: discord.Interaction, category: str = "all", status: str = "all",
+                               summary: bool = False):
+            mode = "summary" if summary else "list"
+            self._log_command(interaction, "status", [mode, category, status])
+
+            if not self._is_status_channel(interaction.channel):
+                await interaction.response.send_message(
+                    "❌ Oops! I can only respond to commands in the designated download status channel!", ephemeral=True)
+                return
+            status_filter = status.lower()
+            if status_filter not in Config.STATUS_FILTERS:
+                await interaction.response.send_message(
+                    f"❌ Unknown status `{status}`. Try one of: {', '.join(Config.STATUS_FILTERS)}", ephemeral=True)
+                return
+
+            # Acknowledge now; the first fetch can take longer than Discord's 3 seconds
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            try:
+                view = await self._open_status(interaction.channel, category, status_filter, mode)
+                link = f": {view.message.jump_url}" if view.message else ""
+                await interaction.followup.send(f"📥 Status posted{link}", ephemeral=True)
+            except Exception as e:
+                logger.error(f"Error in status command: {str(e)}")
+                await interaction.followup.send(
+                    f"❌ Oops! Something went wrong: {str(e)}\nPlease try again later or contact the admin if this persists.",
+                    ephemeral=True)
+
+        @self.tree.command(name='find', description="🔎 Find torrents by name")
+        @app_commands.describe(query="Words from the torrent name", category="Only this category",
+                               status="completed, downloading or stalled")
+        @app_commands.autocomplete(query=self._complete_name, category=self._complete_category,
+                                   status=self._complete_status)
+        async def slash_find(interaction: discord.Interaction, query: str, category: str = "all", status: str = "all"):
+            self._log_command(interaction, "find", [category, status, query])
+
+            if not self._is_status_channel(interaction.channel):
+                await interaction.response.send_message(
+                    "❌ Oops! I can only respond to commands in the designated download status channel!", ephemeral=True)
+                return
+            status_filter = status.lower()
+            if status_filter not in Config.STATUS_FILTERS:
+                await interaction.response.send_message(
+                    f"❌ Unknown status `{status}`. Try one of: {', '.join(Config.STATUS_FILTERS)}", ephemeral=True)
+                return
+
+            # Building the index on first use means a full fetch, so answer later
+            await interaction.response.defer(thinking=True)
+            try:
+                index = await self._ensure_index()
+                await interaction.followup.send(embed=self._find_embed(index, query, category, status_filter))
+            except Exception as e:
+                logger.error(f"Error in find command: {str(e)}")
+                embed = discord.Embed(
+                    title="❌ Error",
+                    description=f"Oops! Something went wrong: {str(e)}\nPlease try again later or contact the admin if this persists.",
+                    color=discord.Color.red()
+                )
+                await interaction.followup.send(embed=embed)
+
+        @self.command(name='pause',
+                     brief="⏸️ Pause torrents",
+                     help=control_help.replace("%s", "pause"))
+        async def pause(ctx, *args):
+            self._log_command(ctx, "pause", args)
+            await self._control_command(ctx, args, 'torrents_pause', "⏸️ Paused",
+                                        verb="pause", example="$pause tv stalled")
+
+        @self.command(name='resume',
+                     brief="▶️ Resume torrents",
+                     help=control_help.replace("%s", "resume"))
+        async def resume(ctx, *args):
+            self._log_command(ctx, "resume", args)
+            await self._control_command(ctx, args, 'torrents_resume', "▶️ Resumed",
+                                        verb="resume", example="$resume tv stalled")
+
+        @self.command(name='recheck',
+                     brief="🔁 Recheck torrent data",
+                     help=control_help.replace("%s", "recheck"))
+        async def recheck(ctx, *args):
+            self._log_command(ctx, "recheck", args)
+            await self._control_command(ctx, args, 'torrents_recheck', "🔁 Rechecking",
+                                        verb="recheck", example="$recheck tv-sonarr",
+                                        confirm="Recheck", confirm_over=1)
+
+        @self.command(name='setcategory',
+                     brief="📁 Move torrents to another category",
+                     help="""
+📁 **How to use the setcategory command:**
+
+`$setcategory movies tv matrix` - Move TV torrents named "matrix" to movies
+`$setcategory music all completed` - Move every finished torrent to "music"
+
+The new category comes first, then the same filters and name words as `$status` and `$find`.
+🔒 Needs the Manage Server permission or a role listed in `CONTROL_ROLE`.
+""")
+        async def setcategory(ctx, new_category=None, *args):
+            self._log_command(ctx, "setcategory", (new_category,) + args)
+            if not new_category:
+                await self.outbox.send(ctx.channel, content="❌ Which category? Try `$setcategory movies tv matrix`.")
+                return
+            example = f"$setcategory {new_category} tv matrix"
+            new_category = Config.map_category(new_category)
+            await self._control_command(ctx, args, 'torrents_set_category', f"📁 Moved to `{new_category}`",
+                                        verb="move", example=example,
+                                        confirm="Move", confirm_over=1,
+                                        category=new_category)
+
+        @self.command(name='delete',
+                     brief="🗑️ Delete torrents (asks first)",
+                     help="""
+🗑️ **How to use the delete command:**
+
+`$delete movies completed matrix` - Remove finished movies named "matrix", keeping their files
+`$delete tv stalled --files` - Remove stalled TV torrents and their downloaded data
+
+Filters and name words work like `$status` and `$find`. You'll see what matches and must confirm first.
+🔒 Needs the Manage Server permission or a role listed in `CONTROL_ROLE`.
+""")
+        async def delete(ctx, *args):
+            self._log_command(ctx, "delete", args)
+            delete_files = "--files" in args
+            args = tuple(arg for arg in args if arg != "--files")
+            await self._control_command(ctx, args, 'torrents_delete',
+                                        "🗑️ Deleted with files" if delete_files else "🗑️ Deleted",
+                                        verb="delete", example="$delete movies completed matrix",
+                                        confirm="Delete with files" if delete_files else "Delete",
+                                        delete_files=delete_files)
+
+        @self.command(name='details',
+                     brief="🔬 Files, trackers and health of one torrent",
+                     help="""
+🔬 **How to use the details command:**
+
+`$details matrix` - The best name match for "matrix"
+`$details 8f3a1c` - The torrent whose hash starts with 8f3a1c
+
+Shows progress, pieces, seeds and peers, every tracker's state and the files, with buttons to page through big packs.
+""")
+        async def details(ctx, *args):
+            # Log the command
+            self._log_command(ctx, "details", args)
+
+            if not self._is_status_channel(ctx.channel):
+                await self.outbox.send(ctx.channel, content="❌ Oops! I can only respond to commands in the designated download status channel!")
+                return
+
+            query = " ".join(args).strip()
+            if not query:
+                await self.outbox.send(ctx.channel, content="❌ Which torrent? Try `$details matrix` or part of its hash.")
+                return
+
+            try:
+                torrent, total, candidates = await self._resolve_torrent(query)
+                if candidates:
+                    shown = candidates[:Config.CONTROL_PREVIEW]
+                    lines = [f"▫️ {torrent.name[:100]} `{torrent.hash[:12]}`" for torrent in shown]
+                    if len(candidates) > len(shown):
+                        lines.append(f"…and {len(candidates) - len(shown)} more")
+                    embed = discord.Embed(
+                        title=f"🤔 {len(candidates)} torrents start with `{query.lower()}`",
+                        description="\n".join(lines) + "\n\n💡 Add more of the hash, or use name words, to pick one.",
+                        color=discord.Color.orange()
+                    )
+                    await self.outbox.send(ctx.channel, embed=embed)
+                    return
+                if torrent is None:
+                    await self.outbox.send(ctx.channel, content="🤔 No torrent matches that.")
+                    return
+
+                view = DetailsView(self, torrent)
+                embed, pages = await self._render_details(torrent, view.page)
+                if total > 1:
+                    embed.description += f"\n\n💡 Best of {total} matches; add more words to pick another."
+                view.update(pages)
+                await self.outbox.send(ctx.channel, embed=embed, view=view)
+
+            except Exception as e:
+                logger.error(f"Error in details command: {str(e)}")
+                embed = discord.Embed(
+                    title="❌ Error",
+                    description=f"Oops! Something went wrong: {str(e)}\nPlease try again later or contact the admin if this persists.",
+                    color=discord.Color.red()
                 )
-                if self.last_status_message:
-                    await self.last_status_message.edit(embed=embed)
-                else:
-                    self.last_status_message = await ctx.send(embed=embed)
-                    await self.last_status_message.add_reaction("⏸️")
-                    await self.last_status_message.add_reaction("▶️")
+                await self.outbox.send(ctx.channel, embed=embed)
+
+        @self.command(name='stats',
+                     brief="📊 Transfer history: speeds, fastest and longest-stalled torrents",
+                     help="""
+📊 **How to use the stats command:**
+
+`$stats` - Download/upload speed over the last day
+`$stats hour` - ...over the last hour
+`$stats week` - ...over the last week
+`$stats month` - ...over the last month
+
+Each report shows a speed sparkline, average and peak speeds, the fastest
+torrents of the period and the torrents that have been stalled the longest.
+""")
+        async def stats(ctx, period="day"):
+            # Log the command
+            self._log_command(ctx, "stats", [period])
+
+            if not self._is_status_channel(ctx.channel):
+                await self.outbox.send(ctx.channel, content="❌ Oops! I can only respond to commands in the designated download status channel!")
                 return
 
-            # Format and send messages
-            messages = self._format_for_discord(filtered)
-            
-            # If we have existing messages, edit them or delete extras
-            if self.last_status_message:
-                try:
-                    await self.last_status_message.delete()
-                except discord.NotFound:
-                    pass
+            if not self.stats_store:
+                await self.outbox.send(ctx.channel, content="❌ Transfer history is turned off (set `STATS_DB` to enable it).")
+                return
+
+            periods = {
+                'hour': (3600, StatsStore.MINUTE),
+                'day': (86400, StatsStore.HOUR),
+                'week': (7 * 86400, StatsStore.HOUR),
+                'month': (30 * 86400, StatsStore.HOUR),
+            }
+            if period.lower() not in periods:
+                await self.outbox.send(ctx.channel, content=f"❌ Unknown period `{period}`. Try `hour`, `day`, `week` or `month`.")
+                return
+
+            try:
+                span, resolution = periods[period.lower()]
+                rows, stalled, top = await self.stats_store.summary(span, resolution)
+                await self.outbox.send(ctx.channel, embed=self._format_stats(period.lower(), rows, stalled, top))
+            except Exception as e:
+                logger.error(f"Error in stats command: {str(e)}")
+                embed = discord.Embed(
+                    title="❌ Error",
+                    description=f"Oops! Something went wrong: {str(e)}\nPlease try again later or contact the admin if this persists.",
+                    color=discord.Color.red()
+                )
+                await self.outbox.send(ctx.channel, embed=embed)
+
+        @self.command(name='perf',
+                     brief="⏱️ Where refresh time goes: qBittorrent, rendering or Discord",
+                     help="""
+⏱️ **How to use the perf command:**
+
+`$perf` - Latency of qBittorrent calls, filtering, rendering and Discord calls,
+Discord rate limits, the outbound queue and the auto-update loop.
+
+💡 Needs `METRICS_ENABLED=true` (or a `METRICS_PORT`) in the bot's settings.
+""")
+        async def perf(ctx):
+            # Log the command
+            self._log_command(ctx, "perf")
+
+            if not self._is_status_channel(ctx.channel):
+                await self.outbox.send(ctx.channel, content="❌ Oops! I can only respond to commands in the designated download status channel!")
+                return
+
+            if not metrics.enabled:
+                await self.outbox.send(ctx.channel, content="❌ Metrics are turned off (set `METRICS_ENABLED=true` to enable them).")
+                return
+
+            await self.outbox.send(ctx.channel, embed=self._format_perf())
+
+        @self.command(name='help_downloads',
+                     brief="📚 Learn how to use the download status bot",
+                     help="""
+🤖 **Welcome to the Download Status Bot!**
+
+This bot helps you keep track of your downloads from qBittorrent. Here's how to use it:
+
+📋 **Basic Commands:**
+1. `$status` - Shows all your downloads
+2. `$help` - Shows this help message
+3. `/status` and `/find` - The same as slash commands, with suggestions as you type
+
+🎯 **Filtering Downloads:**
+• By Category:
+  `$status movies` - Only movie downloads
+  `$status tv` - Only TV show downloads
+
+• By Status:
+  `$status completed` - Finished downloads
+  `$status downloading` - Active downloads
+
+• Combined:
+  `$status movies completed` - Finished movies
+  `$status tv downloading` - TV shows in progress
+
+📊 **Understanding the Status:**
+• Each download shows:
+  - 📝 Name of the file
+  - 📈 Progress percentage
+  - ⚡ Download speed
+  - ⏱️ Time remaining
+  - 💾 File size
+
+💡 **Tips:**
+• Messages update automatically
+• Old messages are cleaned up
+• Downloads are sorted by progress
+• Use emojis to quickly identify status
+
+❓ **Need Help?**
+If something's not working, contact the admin!
+""")
+        async def help_downloads(ctx):
+            # Log the command
+            self._log_command(ctx, "help_downloads")
+
+            if not self._is_status_channel(ctx.channel):
+                await self.outbox.send(ctx.channel, content="❌ Oops! I can only respond to commands in the designated download status channel!")
+                return
+
+            embed = discord.Embed(
+                title="📚 Download Status Bot Help",
+                description=self.get_command('help_downloads').help,
+                color=discord.Color.blue()
+            )
+            embed.set_footer(text="🤖 Type $status to check your downloads!")
+            await self.outbox.send(ctx.channel, embed=embed)
+
+    async def _open_status(self, channel, category, status_filter, mode):
+        """Post a status view in `channel`, replacing any with the same filters"""
+        view = StatusView(channel, category, status_filter, mode)
+        self.status_views.pop(view.key, None)
+
+        # Make room: the oldest views in the channel go, messages and all
+        in_channel = [v for v in self.status_views.values() if v.channel.id == channel.id]
+        for old in in_channel[:max(0, len(in_channel) - Config.MAX_STATUS_VIEWS + 1)]:
+            await self._retire_view(old)
+
+        # Clean up old messages
+        await self._clean_channel(channel)
+
+        # Subscribe and show the first status
+        self.status_views[view.key] = view
+        self._save_state()
+        await self._request_refresh([view], background=False)
+        return view
+
+    def _find_embed(self, index, query, category, status_filter):
+        mapped_category = Config.map_category(category)
+        matches, total = index.search(
+            query,
+            limit=Config.FIND_LIMIT,
+            predicate=lambda torrent: self._matches_filters(torrent, mapped_category, status_filter)
+        )
+
+        # One embed holds 4096 characters; stop at the last row that fits
+        description, shown = "", 0
+        for torrent in matches:
+            row = self._format_for_discord([torrent])[0]
+            if len(description) + len(row) > Config.EMBED_DESCRIPTION_CHARS:
+                break
+            description += row
+            shown += 1
+
+        embed = discord.Embed(
+            title=f"🔎 Results for \"{query}\"",
+            description=description or "No torrents match that search. 🤔",
+            color=discord.Color.green() if matches else discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+        embed.set_footer(text=f"Showing {shown} of {total} matches | 💾 Powered by r-lab.ovh")
+        return embed
+
+    # Slash command autocomplete: answered from memory, never from qBittorrent
+
+    @staticmethod
+    def _choices(values, current):
+        current = current.lower()
+        matches = sorted(v for v in values if current in v.lower())
+        return [app_commands.Choice(name=v, value=v) for v in matches[:Config.AUTOCOMPLETE_LIMIT]]
+
+    async def _complete_category(self, interaction, current):
+        return self._choices(set(Config.CATEGORY_ALIASES) | self.torrent_manager.categories(), current)
+
+    async def _complete_status(self, interaction, current):
+        return self._choices(Config.STATUS_FILTERS, current)
+
+    async def _complete_name(self, interaction, current):
+        # Suggestions only once `$find` or `/find` has built the index
+        if self.name_index is None or not current.strip():
+            return []
+        matches, _ = self.name_index.search(current, limit=Config.AUTOCOMPLETE_LIMIT)
+        # Choice names and values are capped at 100 characters
+        return [app_commands.Choice(name=t.name[:100], value=t.name[:100]) for t in matches]
+
+    def _parse_status_args(self, args):
+        """`[summary] [category] [status]` as $status takes them, or None if words are left over"""
+        mode = "list"
+        if args and args[0].lower() == "summary":
+            mode = "summary"
+            args = args[1:]
+        category, status_filter, rest = self._parse_filters(args)
+        if rest and len(rest) == len(args):
+            # Nothing matched: a category the torrent table hasn't shown us yet, maybe with a status
+            if len(rest) == 1 or (len(rest) == 2 and rest[1].lower() in Config.STATUS_FILTERS):
+                category = rest[0]
+                status_filter = rest[1].lower() if len(rest) == 2 else "all"
+                rest = []
+        if rest:
+            return None
+        return mode, category, status_filter
+
+    def _parse_filters(self, args):
+        """Split leading `[category] [status]` words off `args`, the way $status takes them"""
+        args = list(args)
+        category, status_filter = "all", "all"
+        categories = set(Config.CATEGORY_ALIASES) | {c.lower() for c in self.torrent_manager.categories()}
+        if args and args[0].lower() in categories:
+            category = args.pop(0)
+        if args and args[0].lower() in Config.STATUS_FILTERS:
+            status_filter = args.pop(0).lower()
+        return category, status_filter, args
+
+    def _can_control(self, member):
+        """Whether `member` may change torrents: Manage Server, or one of the CONTROL_ROLE roles"""
+        permissions = getattr(member, 'guild_permissions', None)
+        if permissions and permissions.manage_guild:
+            return True
+        allowed = self.config['CONTROL_ROLES']
+        return any(role.name in allowed or str(role.id) in allowed for role in getattr(member, 'roles', ()))
+
+    async def _select_torrents(self, args):
+        """Torrents matching `$status`-style filters and `$find`-style name words in `args`"""
+        key = ("all", "all")
+        snapshot = (await self.torrent_manager.get_snapshots({key}))[key]
+        category, status_filter, words = self._parse_filters(args)
+        mapped_category = Config.map_category(category)
+
+        def wanted(torrent):
+            return self._matches_filters(torrent, mapped_category, status_filter)
+
+        if words:
+            index = await self._ensure_index()
+            matches, _ = index.search(" ".join(words), predicate=wanted)
+            return matches
+        return [torrent for torrent in snapshot if wanted(torrent)]
+
+    def _describe_torrents(self, torrents):
+        names = [f"▫️ {torrent.name[:100]}" for torrent in torrents[:Config.CONTROL_PREVIEW]]
+        if len(torrents) > Config.CONTROL_PREVIEW:
+            names.append(f"…and {len(torrents) - Config.CONTROL_PREVIEW} more")
+        return "\n".join(names)
+
+    async def _control_command(self, ctx, args, method, done, verb, example, confirm=None, confirm_over=0, **params):
+        """Resolve `args` to torrents and apply `method` to them in one call per backend
 
-            # Send new messages
-            last_message = None
-            for i, msg in enumerate(messages, 1):
+        With `confirm` (the button label) the user must approve the matched set
+        first, whenever it holds more than `confirm_over` torrents.
+        """
+        if not self._is_status_channel(ctx.channel):
+            await self.outbox.send(ctx.channel, content="❌ Oops! I can only respond to commands in the designated download status channel!")
+            return
+
+        if not self._can_control(ctx.author):
+            await self.outbox.send(ctx.channel, content="❌ Sorry, you're not allowed to change torrents.")
+            return
+
+        if not args:
+            # Never everything by accident; `all` says so on purpose
+            await self.outbox.send(ctx.channel, content=f"❌ Say which torrents to {verb}, e.g. `{example}`. Use `all` to mean every torrent.")
+            return
+
+        try:
+            torrents = await self._select_torrents(args)
+            if not torrents:
+                await self.outbox.send(ctx.channel, content="🤔 No torrents match that.")
+                return
+
+            prompt = None
+            if confirm and len(torrents) > confirm_over:
+                # Destructive or bulk: show exactly what will change, and act on that set only
+                view = ConfirmView(ctx.author.id, f"{confirm} {len(torrents)}", emoji=done.split()[0])
                 embed = discord.Embed(
-                    title=f"Download Status {f'(Part {i}/{len(messages)})' if len(messages) > 1 else ''}",
-                    description=msg,
-                    color=discord.Color.green(),
-                    timestamp=datetime.now()
+                    title=f"⚠️ This will affect {len(torrents)} {'torrent' if len(torrents) == 1 else 'torrents'}",
+                    description=self._describe_torrents(torrents),
+                    color=discord.Color.orange()
+                )
+                embed.set_footer(text="Nothing happens unless you confirm within a minute")
+                prompt = await self.outbox.send(ctx.channel, embed=embed, view=view)
+                await view.wait()
+                if not view.confirmed:
+                    embed.title = "❎ Cancelled"
+                    embed.set_footer(text="Nothing was changed")
+                    await self.outbox.edit(prompt, embed=embed, view=None)
+                    return
+
+            errors = await self.torrent_manager.apply(method, torrents, **params)
+            affected = [torrent for torrent in torrents if torrent.instance not in errors]
+
+            embed = discord.Embed(
+                title=f"{done} {len(affected)} {'torrent' if len(affected) == 1 else 'torrents'}",
+                description=self._describe_torrents(affected) or "Nothing was changed.",
+                color=discord.Color.red() if errors else discord.Color.green(),
+                timestamp=datetime.now()
+            )
+            if errors:
+                embed.add_field(
+                    name="⚠️ Failed",
+                    value="\n".join(f"▫️ {name}: {error}" for name, error in sorted(errors.items()))[:1024],
+                    inline=False
+                )
+            embed.set_footer(text="💾 Powered by r-lab.ovh")
+            if prompt:
+                await self.outbox.edit(prompt, embed=embed, view=None)
+            else:
+                await self.outbox.send(ctx.channel, embed=embed)
+            logger.info(f"{method} on {len(affected)} torrents by {ctx.author.name}#{ctx.author.discriminator}",
+                        extra={'event': 'control_command', 'method': method, 'torrents': len(affected),
+                               'failed_backends': sorted(errors), 'user_id': ctx.author.id})
+
+            # qBittorrent applies these in the background; look again shortly
+            self._refresh_soon()
+
+        except Exception as e:
+            logger.error(f"Error in {method} command: {str(e)}")
+            embed = discord.Embed(
+                title="❌ Error",
+                description=f"Oops! Something went wrong: {str(e)}\nPlease try again later or contact the admin if this persists.",
+                color=discord.Color.red()
+            )
+            await self.outbox.send(ctx.channel, embed=embed)
+
+    async def _resolve_torrent(self, query):
+        """The torrent a `$details` query means: a hash prefix, else the best name match
+
+        Returns it (or None) and how many torrents matched. A hash prefix shared
+        by several torrents picks none of them; they come back as candidates.
+        """
+        key = ("all", "all")
+        await self.torrent_manager.get_snapshots({key})
+        prefix = query.lower()
+        if re.fullmatch(r'[0-9a-f]{6,40}', prefix):
+            matches = [torrent for torrent in self.torrent_manager.torrents if torrent.hash.startswith(prefix)]
+            if len(matches) > 1:
+                return None, len(matches), sorted(matches, key=attrgetter('name'))
+            if matches:
+                return matches[0], 1, []
+        index = await self._ensure_index()
+        matches, total = index.search(query, limit=1)
+        return (matches[0] if matches else None), total, []
+
+    async def _render_details(self, torrent, page):
+        """Build the `$details` embed for one page of files; returns it and the page count"""
+        tm = TorrentManager
+        key = (torrent.instance, torrent.hash)
+        details = self.details_cache.get(key)
+        if details is None:
+            manager = self.torrent_manager.managers[torrent.instance]
+            details = await manager.details(torrent.hash)
+            self.details_cache.put(key, details, weight=len(details.files) + 1)
+
+        props = details.properties
+        status_emoji = "✅" if torrent.status == Status.COMPLETED else "⏳"
+        lines = [
+            f"{status_emoji} `{torrent.status}` | Progress: `{tm._format_progress(torrent.progress)}` | Size: `{tm._format_size(torrent.size)}`",
+            f"▫️ Speed: `{tm._format_speed(torrent.dlspeed)}` | {tm._format_eta(torrent.eta)}",
+        ]
+        if props['pieces_num']:
+            lines.append(f"▫️ Pieces: `{props['pieces_have']}/{props['pieces_num']}` of `{tm._format_size(props['piece_size'] or 0)}`")
+        lines.append(f"▫️ Seeds: `{props['seeds']} ({props['seeds_total']})` | Peers: `{props['peers']} ({props['peers_total']})`")
+        if props['total_wasted']:
+            lines.append(f"▫️ Wasted: `{tm._format_size(props['total_wasted'])}`")
+        if props['save_path']:
+            lines.append(f"▫️ Saved in: `{props['save_path']}`")
+        lines.append(f"▫️ Hash: `{torrent.hash}`{f' | Instance: `{torrent.instance}`' if self.torrent_manager.multiple else ''}")
+
+        # Files go in the description, which has room for a full page of them
+        pages = max(1, -(-len(details.files) // Config.DETAILS_PAGE_SIZE))
+        page = max(0, min(page, pages - 1))
+        start = page * Config.DETAILS_PAGE_SIZE
+        lines.append(f"\n📄 **Files ({len(details.files)})**{f' - page {page + 1}/{pages}' if pages > 1 else ''}")
+        for name, size, progress, priority, availability in details.files[start:start + Config.DETAILS_PAGE_SIZE]:
+            skipped = " `skipped`" if priority == 0 else ""
+            available = f" | avail `{availability:.2f}`" if 0 <= availability < 1 else ""
+            lines.append(f"▫️ {name[-80:]} - `{tm._format_progress(progress)}` of `{tm._format_size(size)}`{available}{skipped}")
+        if not details.files:
+            lines.append("No files yet (still fetching metadata?)")
+
+        embed = discord.Embed(
+            title=torrent.name[:256],
+            description="\n".join(lines)[:4000],
+            color=discord.Color.green() if torrent.status == Status.COMPLETED else discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+
+        tracker_states = {0: "⚫ Disabled", 1: "⚪ Not contacted", 2: "🟢 Working", 3: "🔄 Updating", 4: "🔴 Not working"}
+        if details.trackers:
+            embed.add_field(
+                name=f"📡 Trackers ({len(details.trackers)})",
+                value="\n".join(
+                    f"{tracker_states.get(status, '❔')} {url[:60]}"
+                    f"{f' - {seeds} seeds, {peers} peers' if seeds >= 0 else ''}{f' - {msg[:60]}' if msg else ''}"
+                    for url, status, seeds, peers, msg in details.trackers[:5]
+                )[:1024],
+                inline=False
+            )
+        embed.set_footer(text="💾 Powered by r-lab.ovh")
+        return embed, pages
+
+    async def _turn_details_page(self, interaction, view, step):
+        await interaction.response.defer()
+        view.page += step
+        try:
+            embed, pages = await self._render_details(view.torrent, view.page)
+        except Exception as e:
+            logger.error(f"Error paging details: {str(e)}")
+            view.page -= step
+            await interaction.followup.send(f"❌ Couldn't load that page: {str(e)}", ephemeral=True)
+            return
+        view.page = max(0, min(view.page, pages - 1))
+        view.update(pages)
+        await self.outbox.edit(interaction.message, embed=embed, view=view)
+
+    def _refresh_soon(self, delay=3.0):
+        """Bring the next auto-update forward to `delay` seconds from now"""
+        due = asyncio.get_running_loop().time() + delay
+        if due < self.next_refresh_due:
+            self.next_refresh_due = due
+            self.refresh_wakeup.set()
+
+    async def _ensure_index(self):
+        """Build the name index on first use; sync deltas keep it current afterwards"""
+        async with self.index_lock:
+            if self.name_index is None:
+                # Published only once complete, so nobody searches a half-built index
+                index = NameIndex()
+                self.torrent_manager.add_listener(index.handle)
+                try:
+                    # With a listener attached this makes (or keeps) the sync tables live
+                    await self.torrent_manager.get_snapshots({("all", "all")})
+                except BaseException:
+                    self.torrent_manager.remove_listener(index.handle)
+                    raise
+                index.rebuild(self.torrent_manager.torrents)
+                self.name_index = index
+        return self.name_index
+
+    async def _clean_channel(self, channel):
+        """Delete the messages we tracked in `channel`, sparing other views' status messages"""
+        keep = {
+            view.message.id
+            for view in self.status_views.values()
+            if view.channel.id == channel.id and view.message
+        }
+        tracked = self.tracked_messages.get(channel.id, ())
+        doomed = [message_id for message_id in dict.fromkeys(tracked) if message_id not in keep]
+        self.tracked_messages[channel.id] = deque(
+            (message_id for message_id in tracked if message_id in keep), maxlen=Config.TRACKED_MESSAGES
+        )
+        if not doomed:
+            return
+
+        # Bulk deletion takes up to 100 messages at a time, none older than 14 days
+        cutoff = discord.utils.utcnow() - timedelta(days=14) + timedelta(minutes=5)
+        recent = [discord.Object(message_id) for message_id in doomed
+                  if discord.utils.snowflake_time(message_id) > cutoff]
+        batches = [recent[i:i + 100] for i in range(0, len(recent), 100)]
+        batches += [[discord.Object(message_id)] for message_id in doomed
+                    if discord.utils.snowflake_time(message_id) <= cutoff]
+        for batch in batches:
+            try:
+                await self.outbox.delete_messages(channel, batch)
+            except discord.NotFound:
+                pass  # Already gone
+            except discord.HTTPException as e:
+                logger.error(f"Error cleaning up #{getattr(channel, 'name', channel.id)}: {str(e)}")
+        self._save_state()
+
+    @staticmethod
+    def _matches_filters(torrent, category, status_filter):
+        return (category == "all" or torrent.category == category) and \
+               (status_filter == "all" or
+                (status_filter == Config.COMPLETE_STATUS and torrent.status == Status.COMPLETED) or
+                (status_filter == Config.DOWNLOADING_STATUS and torrent.status != Status.COMPLETED) or
+                (status_filter == Config.STALLED_STATUS and torrent.status == Status.STALLED))
+
+    def _filter_torrents(self, torrents, category, status_filter):
+        # Left unordered: only the page being shown ever gets sorted
+        return [
+            torrent for torrent in torrents
+            if self._matches_filters(torrent, category, status_filter)
+        ]
+
+    def _patch_rows(self, view, fresh):
+        """Swap freshly fetched records into the view's rows; returns whether any touch it"""
+        keys = {(torrent.instance, torrent.hash) for torrent in fresh}
+        kept = [row for row in view.rows if (row.instance, row.hash) not in keys]
+        matching = [torrent for torrent in fresh if self._matches_filters(torrent, *view.filter_key)]
+        if len(kept) == len(view.rows) and not matching:
+            return False
+        view.rows = kept + matching
+        return True
+
+    @staticmethod
+    def _page_rows(view):
+        """The torrents on the view's current page, by progress
+
+        Selects the top rows up to the end of the page instead of sorting
+        every match, so the usual first pages cost the same for any library.
+        """
+        view.page = max(0, min(view.page, view.pages - 1))
+        end = (view.page + 1) * Config.PAGE_SIZE
+        return heapq.nlargest(end, view.rows, key=attrgetter('progress'))[end - Config.PAGE_SIZE:]
+
+    def _format_perf(self):
+        """Build the $perf embed from the live metrics"""
+        def ms(seconds):
+            if seconds is None:
+                return "n/a"
+            return "∞" if seconds == float('inf') else f"≤{seconds * 1000:g} ms"
+
+        def line(label, name, **labels):
+            return (f"▫️ {label}: p50 `{ms(metrics.quantile(name, 0.5, **labels))}` | "
+                    f"p95 `{ms(metrics.quantile(name, 0.95, **labels))}`")
+
+        qbit_lines = [line(f"{manager.name}", 'qbit_call_seconds', instance=manager.name)
+                      for manager in self.torrent_manager.managers.values()]
+        errors = sum(v for (n, _), v in metrics.counters.items() if n == 'qbit_errors_total')
+        qbit_lines.append(f"▫️ Calls: `{metrics.count('qbit_call_seconds')}` | Errors: `{errors}`")
+
+        outbox = self.outbox.stats()
+        discord_lines = [
+            line("Calls", 'discord_call_seconds'),
+            line("Queue wait", 'discord_queue_wait_seconds'),
+            f"▫️ Calls: `{outbox['calls']}` | Collapsed: `{outbox['collapsed']}` | 429s: `{outbox['rate_limited']}`",
+            f"▫️ Queue depth: `{outbox['depth']}` | Max wait: `{outbox['max_wait']:.2f}s`",
+        ]
+
+        age = f"{time.time() - self.last_auto_update:.0f}s ago" if self.last_auto_update else "not yet"
+        snapshot = metrics.gauges.get(('snapshot_torrents', ()), 0)
+        refresh_lines = [
+            line("Filter", 'filter_seconds'),
+            line("Render", 'render_seconds'),
+            f"▫️ Render cache: `{self.render_cache.hit_rate:.0%}` hits | `{len(self.render_cache.entries)}` rows cached",
+            line("Whole refresh", 'refresh_seconds'),
+            f"▫️ Snapshot: `{snapshot}` torrents | Last auto-update: `{age}`",
+            f"▫️ Next interval: `{self.scheduler.interval:.0f}s`",
+        ]
+
+        embed = discord.Embed(title="⏱️ Performance", color=discord.Color.dark_teal(), timestamp=datetime.now())
+        embed.add_field(name="🧲 qBittorrent", value="\n".join(qbit_lines)[:1024], inline=False)
+        embed.add_field(name="🖼️ Refresh", value="\n".join(refresh_lines), inline=False)
+        embed.add_field(name="💬 Discord", value="\n".join(discord_lines), inline=False)
+        embed.set_footer(text="💾 Powered by r-lab.ovh")
+        return embed
+
+    def _format_stats(self, period, rows, stalled, top):
+        """Build the $stats embed from precomputed rollups"""
+        tm = TorrentManager
+        embed = discord.Embed(
+            title=f"📊 Transfer Stats (last {period})",
+            color=discord.Color.purple(),
+            timestamp=datetime.now()
+        )
+        if not rows:
+            embed.description = "No history recorded yet. Check back after a few updates! ⏳"
+            return embed
+
+        samples = sum(row[1] for row in rows)
+        dl_avg = [row[2] / row[1] for row in rows]
+        up_avg = [row[4] / row[1] for row in rows]
+        embed.add_field(
+            name="⬇️ Download",
+            value=(
+                f"`{StatsStore.sparkline(dl_avg)}`\n"
+                f"▫️ Average: `{tm._format_speed(sum(row[2] for row in rows) / samples)}` | "
+                f"Peak: `{tm._format_speed(max(row[3] for row in rows))}`"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="⬆️ Upload",
+            value=(
+                f"`{StatsStore.sparkline(up_avg)}`\n"
+                f"▫️ Average: `{tm._format_speed(sum(row[4] for row in rows) / samples)}` | "
+                f"Peak: `{tm._format_speed(max(row[5] for row in rows))}`"
+            ),
+            inline=False
+        )
+
+        tag_instance = self.torrent_manager.multiple
+        if top:
+            embed.add_field(
+                name="🏎️ Fastest Downloads",
+                value="\n".join(
+                    f"▫️ {name}{f' `[{instance}]`' if tag_instance else ''} - `{tm._format_speed(avg_dl)}`"
+                    for name, instance, avg_dl in top
+                )[:1024],
+                inline=False
+            )
+        if stalled:
+            now = int(time.time())
+            embed.add_field(
+                name="🐢 Stalled Longest",
+                value="\n".join(
+                    f"▫️ {name}{f' `[{instance}]`' if tag_instance else ''} - for `{tm._format_duration(now - since) or 'a moment'}`"
+                    for name, instance, since in stalled
+                )[:1024],
+                inline=False
+            )
+        embed.set_footer(text="💾 Powered by r-lab.ovh")
+        return embed
+
+    def _format_for_discord(self, torrents):
+        messages = []
+        current_msg = ""
+        
+        tm = TorrentManager
+        tag_instance = self.torrent_manager.multiple
+        cache = self.render_cache
+        for torrent in torrents:
+            # Everything the row's text depends on; seeding torrents keep theirs for good
+            key = (torrent.instance, torrent.hash)
+            fingerprint = (torrent.name, torrent.progress, torrent.status, torrent.size,
+                           tm._eta_bucket(torrent.eta), torrent.dlspeed, tag_instance)
+            entry = cache.get(key, fingerprint)
+            if entry is None:
+                # Add emoji based on status
+                status_emoji = "✅" if torrent.status == Status.COMPLETED else "⏳"
+                instance_tag = f" `[{torrent.instance}]`" if tag_instance else ""
+
+                entry = (
+                    f"**{torrent.name}** {status_emoji}{instance_tag}\n"
+                    f"▫️ Progress: `{tm._format_progress(torrent.progress)}` | Status: `{torrent.status}`\n"
+                    f"▫️ Size: `{tm._format_size(torrent.size)}` | Speed: `{tm._format_speed(torrent.dlspeed)}`\n"
+                    f"▫️ {tm._format_eta(torrent.eta)}\n\n"
                 )
-                
-                # Add filter info to footer if filters are active
-                filter_info = ""
-                if category != "all" or status_filter != "all":
-                    if category != "all":
-                        # Use user-friendly category names in the footer
-                        display_category = "TV Shows" if category.lower() in ['tv', 'tv-sonarr'] else "Movies" if category.lower() in ['movies', 'radarr'] else category
-                        filter_info += f"📁 Category: {display_category} | "
-                    if status_filter != "all":
-                        filter_info += f"🔍 Filter: {status_filter} | "
-                
-                refresh_status = "🔄 Auto-refresh enabled" if self.auto_refresh_enabled else "⏸️ Auto-refresh paused"
-                footer_text = f"{filter_info}{refresh_status} | Last update: {datetime.now().strftime('%H:%M:%S')} | 💾 Powered by r-lab.ovh"
-                embed.set_footer(text=footer_text)
-                
-                last_message = await ctx.send(embed=embed)
-                if i == 1:  # Only add reactions to the first message
-                    await last_message.add_reaction("⏸️")
-                    await last_message.add_reaction("▶️")
+                cache.put(key, fingerprint, entry)
             
-            self.last_status_message = last_message
-
-            # Log auto-updates
-            if not hasattr(ctx, 'author'):  # This is an auto-update
-                print(f"\n{'='*50}\nAuto-update completed at {datetime.now().strftime('%H:%M:%S')}")
-                if filtered:
-                    print(f"Found {len(filtered)} {'item' if len(filtered) == 1 else 'items'}")
-                    if category != "all":
-                        print(f"Category filter: {category}")
-                    if status_filter != "all":
-                        print(f"Status filter: {status_filter}")
-                print(f"{'='*50}")
+            if len(current_msg) + len(entry) > Config.MAX_DISCORD_CHARS:
+                messages.append(current_msg)
+                current_msg = entry
+            else:
+                current_msg += entry
+        
+        if current_msg:
+            messages.append(current_msg)
+        
+        return messages
+
+    async def _request_refresh(self, views, background=True):
+        """Refresh `views`, joining the fetch in flight instead of starting another
+
+        Returns the (active, changed) result of the refresh that covered them.
+        """
+        keys = [view.key for view in views]
+        for view in views:
+            self.pending_refresh[view.key] = view
+        self.pending_background = self.pending_background and background
+
+        result = (False, False)
+        # A fetch that started before we queued doesn't include our views; wait for the next one
+        while any(key in self.pending_refresh for key in keys):
+            if self.refresh_task is None or self.refresh_task.done():
+                self.refresh_task = asyncio.ensure_future(self._run_pending_refresh())
+            # Shielded so one impatient caller can't cancel everybody's fetch
+            result = await asyncio.shield(self.refresh_task)
+        return result
+
+    async def _run_pending_refresh(self):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        views = list(self.pending_refresh.values())
+        background = self.pending_background
+        self.pending_refresh = {}
+        self.pending_background = True
+
+        active, changed = await self._refresh_views(views, background)
+
+        # A background pass sets the schedule; a user refresh may only bring it forward
+        due = started + self.scheduler.next_interval(active, changed)
+        if background or due < self.next_refresh_due:
+            self.next_refresh_due = due
+            self.refresh_wakeup.set()
+        return active, changed
+
+    async def _refresh_views(self, views, background=True):
+        """Refresh `views` from one shared fetch, filtering once per distinct filter set
+
+        Returns whether anything is downloading and whether any message changed.
+        """
+        started = time.perf_counter()
+        filter_keys = {view.filter_key for view in views}
+        snapshots = await self.torrent_manager.get_snapshots(filter_keys)
+        metrics.set('snapshot_torrents', max((len(s) for s in snapshots.values()), default=0))
+
+        matched = {}
+        active = False
+        for key in filter_keys:
+            filter_started = time.perf_counter()
+            matched[key] = self._filter_torrents(snapshots[key], *key)
+            metrics.observe('filter_seconds', time.perf_counter() - filter_started)
+            active = active or any(torrent.dlspeed > 0 for torrent in matched[key])
+
+        changed = False
+        for view in views:
+            view.rows = matched[view.filter_key]
+            changed = await self._update_status_message(view, background) or changed
+        metrics.observe('refresh_seconds', time.perf_counter() - started, background=background)
+        return active, changed
+
+    async def _update_status_message(self, view, background=True):
+        """Render the view's current page; returns whether its message changed"""
+        try:
+            render_started = time.perf_counter()
+            embed, digest, controls = self._render_status(view)
+            metrics.observe('render_seconds', time.perf_counter() - render_started)
+
+            changed = await self._sync_status_message(view, embed, digest, controls, self._priority(background))
+
+            # Log auto-updates; they come every refresh, so they are sampled
+            if background and changed:
+                logger.info(
+                    f"Auto-update of #{getattr(view.channel, 'name', view.channel.id)}: "
+                    f"{len(view.rows)} {'item' if len(view.rows) == 1 else 'items'}",
+                    extra={'event': 'auto_update', 'channel_id': view.channel.id, 'items': len(view.rows),
+                           'category': view.category, 'status_filter': view.status_filter, 'sample': 'auto_update'}
+                )
+            return changed
 
         except Exception as e:
             logger.error(f"Error updating status: {str(e)}")
-            if ctx:
-                embed = discord.Embed(
-                    title="❌ Error",
-                    description=f"Oops! Something went wrong while updating: {str(e)}\nTrying again in 5 minutes.",
-                    color=discord.Color.red()
-                )
-                await ctx.send(embed=embed)
+            embed = discord.Embed(
+                title="❌ Error",
+                description=f"Oops! Something went wrong while updating: {str(e)}\nTrying again at the next update.",
+                color=discord.Color.red()
+            )
+            await self.outbox.send(view.channel, self._priority(background), embed=embed)
+            return True
+
+    def _render_status(self, view):
+        """Build the embed, content hash and controls for the view's current page"""
+        category, status_filter = view.category, view.status_filter
+
+        # Backends that failed this round are showing their last known rows
+        degraded = ""
+        if self.torrent_manager.errors:
+            degraded = f"⚠️ Unreachable: {', '.join(sorted(self.torrent_manager.errors))} | "
+
+        refresh_status = "🔄 Auto-refresh enabled" if view.auto_refresh else "⏸️ Auto-refresh paused"
+
+        if view.mode == "summary":
+            return self._render_summary(view, degraded, refresh_status)
+
+        if not view.rows:
+            view.page = 0
+            embed = discord.Embed(
+                title="No Downloads Found 🤔",
+                description="Nothing is downloading right now! Why not request something new? 🎬",
+                color=discord.Color.blue()
+            )
+            embed.set_footer(text=f"{degraded}{refresh_status}")
+            controls = StatusControls(self, auto_refresh=view.auto_refresh)
+            return embed, self._embed_hash(embed, degraded, refresh_status), controls
+
+        # Add filter info to footer if filters are active
+        filter_info = ""
+        if category != "all" or status_filter != "all":
+            if category != "all":
+                # Use user-friendly category names in the footer
+                display_category = "TV Shows" if category.lower() in ['tv', 'tv-sonarr'] else "Movies" if category.lower() in ['movies', 'radarr'] else category
+                filter_info += f"📁 Category: {display_category} | "
+            if status_filter != "all":
+                filter_info += f"🔍 Filter: {status_filter} | "
+
+        rows = self._page_rows(view)
+        pages = view.pages
+        count = f"{len(view.rows)} {'torrent' if len(view.rows) == 1 else 'torrents'}"
+        embed = discord.Embed(
+            title=f"Download Status {f'(Page {view.page + 1}/{pages})' if pages > 1 else ''}",
+            description="".join(self._format_for_discord(rows)),
+            color=discord.Color.green(),
+            timestamp=datetime.now()
+        )
+        # Hash before the timestamped footer so an unchanged page stays unchanged
+        digest = self._embed_hash(embed, filter_info, degraded, refresh_status, count)
+        footer_text = f"{filter_info}{degraded}{refresh_status} | {count} | Last update: {datetime.now().strftime('%H:%M:%S')} | 💾 Powered by r-lab.ovh"
+        embed.set_footer(text=footer_text)
+        return embed, digest, StatusControls(self, view.page, pages, view.auto_refresh)
+
+    def _render_summary(self, view, degraded, refresh_status):
+        """Build the dashboard embed: totals over the view's rows, no per-torrent listing"""
+        tm = TorrentManager
+        summary = TorrentSummary(view.rows)
+
+        def counts(tally):
+            return " | ".join(f"{name or 'none'}: `{n}`" for name, n in sorted(tally.items(), key=lambda item: -item[1]))
+
+        lines = [
+            f"📦 **{summary.count}** torrents | `{tm._format_size(summary.size)}`",
+            f"▫️ By status: {counts(summary.by_status) or 'none'}",
+            f"▫️ By category: {counts(summary.by_category) or 'none'}",
+            f"⬇️ Download: `{tm._format_speed(summary.dlspeed)}`",
+        ]
+        if any(manager.server_state for manager in self.torrent_manager.managers.values()):
+            lines.append(f"⬆️ Upload (whole client): `{tm._format_speed(self.torrent_manager.server_totals()[1])}`")
+        lines.append(f"⏳ Left to download: `{tm._format_size(int(summary.remaining))}`")
+        worst = tm._format_duration(summary.worst_eta) if summary.worst_eta else "nothing pending"
+        lines.append(f"⏱️ Longest ETA: `{worst}`{f' | `{summary.no_eta}` without ETA' if summary.no_eta else ''}")
+        if summary.fastest:
+            lines.append("\n🚀 **Fastest:**")
+            lines.extend(f"▫️ {torrent.name[:80]} - `{tm._format_speed(torrent.dlspeed)}`" for torrent in summary.fastest)
+
+        filter_info = ""
+        if view.category != "all":
+            filter_info += f"📁 Category: {view.category} | "
+        if view.status_filter != "all":
+            filter_info += f"🔍 Filter: {view.status_filter} | "
+
+        embed = discord.Embed(
+            title="📊 Download Dashboard",
+            description="\n".join(lines)[:4096],
+            color=discord.Color.green(),
+            timestamp=datetime.now()
+        )
+        # Hash before the timestamped footer so unchanged totals stay unchanged
+        digest = self._embed_hash(embed, filter_info, degraded, refresh_status)
+        embed.set_footer(text=f"{filter_info}{degraded}{refresh_status} | Last update: {datetime.now().strftime('%H:%M:%S')} | 💾 Powered by r-lab.ovh")
+        return embed, digest, StatusControls(self, auto_refresh=view.auto_refresh)
+
+    async def _handle_control(self, interaction, action, page=None):
+        """A click on a status message's controls"""
+        view = self._view_for_message(interaction.message)
+        if view is None:
+            logger.info("Control used on a retired status message",
+                        extra={'event': 'stale_control', 'control': action, 'sample': 'stale_control'})
+            await interaction.response.send_message(
+                "❌ This status message isn't updated anymore. Type `$status` for a fresh one!", ephemeral=True
+            )
+            return
+
+        self._log_control(interaction, action)
+        # Acknowledge right away; the edit itself goes through the outbox with everything else
+        await interaction.response.defer()
+
+        if action == "close":
+            await self._retire_view(view)
+            return
+        if action == "previous":
+            view.page -= 1
+        elif action == "next":
+            view.page += 1
+        elif action == "page":
+            view.page = page
+        elif action == "toggle":
+            view.auto_refresh = not view.auto_refresh
+            logger.info(f"Auto-refresh {'resumed' if view.auto_refresh else 'paused'} by {interaction.user.name}#{interaction.user.discriminator}",
+                        extra={'event': 'auto_refresh', 'enabled': view.auto_refresh, 'channel_id': view.channel.id})
+        self._save_state()
+
+        if action == "refresh" or view.hash is None:
+            # A view resumed after a restart has no rows until its first refresh
+            await self._request_refresh([view], background=False)
+        else:
+            # Other pages come from the rows of the last refresh, without a fetch
+            await self._update_status_message(view, background=False)
+
+    @staticmethod
+    def _embed_hash(embed, *extra):
+        """Stable hash of the parts of an embed that matter for a refresh"""
+        content = "\0".join([embed.title or "", embed.description or "", *extra])
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _priority(background):
+        return DiscordOutbox.BACKGROUND if background else DiscordOutbox.USER
+
+    async def _retire_view(self, view, delete_message=True):
+        """Stop refreshing `view` for good, deleting its status message unless it's gone already"""
+        if self.status_views.get(view.key) is view:
+            del self.status_views[view.key]
+            self._save_state()
+        if delete_message and view.message:
+            try:
+                await self.outbox.delete(view.message)
+            except discord.NotFound:
+                pass  # Already gone
+            except discord.HTTPException as e:
+                logger.error(f"Error deleting a status message: {str(e)}")
+        logger.info(f"Retired status view in #{getattr(view.channel, 'name', view.channel.id)}",
+                    extra={'event': 'retire_view', 'channel_id': view.channel.id,
+                           'category': view.category, 'status_filter': view.status_filter})
+
+    async def _sync_status_message(self, view, embed, digest, controls, priority=DiscordOutbox.USER):
+        """Post or edit the view's status message, skipping the edit when nothing changed
+
+        Returns whether anything was sent or edited.
+        """
+        try:
+            if view.message is None:
+                view.message = await self.outbox.send(view.channel, priority, embed=embed, view=controls)
+                self._save_state()
+            elif view.hash != digest:
+                await self.outbox.edit(view.message, priority, embed=embed, view=controls)
+            else:
+                return False
+            view.hash = digest
+            return True
+
+        except discord.NotFound:
+            # Someone deleted the status message: that's a close, not a cue to post again
+            await self._retire_view(view, delete_message=False)
+            return False
 
     async def _auto_update_status(self):
         await self.wait_until_ready()
+        loop = asyncio.get_running_loop()
         while not self.is_closed():
+            started = loop.time()
+            self.next_refresh_due = started + self.scheduler.interval
             try:
-                if self.last_status_message and self.last_status_message.channel and self.auto_refresh_enabled:
-                    # Use stored filters for updates
-                    await self._update_status_message(
-                        self.last_status_message.channel,
-                        self.current_category,
-                        self.current_status_filter
-                    )
+                # Use each view's stored filters for updates
+                views = [view for view in self.status_views.values() if view.auto_refresh]
+                if views:
+                    await self._request_refresh(views)
+                elif self.events or self.stats_store or self.name_index:
+                    # Nobody is looking, but notifications and history still need fresh deltas
+                    await self._poll_table()
             except Exception as e:
-                logger.error(f"Auto-update error: {str(e)}")
-            await asyncio.sleep(self.update_interval)
+                logger.error(f"Auto-update error: {str(e)}", extra={'event': 'auto_update_error', 'sample': 'auto_update_error'})
+            if self.stats_store:
+                try:
+                    await self.stats_store.record(self.torrent_manager)
+                except Exception as e:
+                    logger.error(f"Error recording stats: {str(e)}")
+            self.last_auto_update = time.time()
+            await self._sleep_until_due()
+
+    async def _poll_table(self):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        key = ("all", "all")
+        snapshots = await self.torrent_manager.get_snapshots({key})
+        active = any(torrent.dlspeed > 0 for torrent in snapshots[key])
+        changed = self.torrent_manager.last_change_count > 0
+        self.next_refresh_due = started + self.scheduler.next_interval(active, changed)
+
+    async def _sleep_until_due(self):
+        """Sleep until `next_refresh_due`, following it if it moves meanwhile"""
+        loop = asyncio.get_running_loop()
+        while True:
+            delay = self.next_refresh_due - loop.time()
+            if delay <= 0:
+                return
+            self.refresh_wakeup.clear()
+            try:
+                await asyncio.wait_for(self.refresh_wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                return
 
 def main():
+    log_listener = setup_logging(Config.load_env())
     try:
         bot = DiscordBot()
-        bot.run(bot.config['DISCORD_TOKEN'])
+        # discord.py logs through our handlers instead of its own
+        bot.run(bot.config['DISCORD_TOKEN'], log_handler=None)
     except Exception as e:
         logger.error(f"Bot crashed: {str(e)}")
         raise
+    finally:
+        log_listener.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
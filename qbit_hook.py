@@ -0,0 +1,77 @@
+"""Tell the bot about a torrent qBittorrent just added or finished
+
+qBittorrent runs this from Options > Downloads > "Run external program":
+
+    python3 /path/to/qbit_hook.py added "%K" --token-file /path/to/hook_token      # on torrent added
+    python3 /path/to/qbit_hook.py finished "%K" --token-file /path/to/hook_token   # on torrent finished
+
+The bot then refreshes just that torrent instead of waiting for its next poll.
+Settings come from the environment or from the options below:
+    HOOK_URL    - the bot's hook endpoint (default http://127.0.0.1:8765/hook)
+    HOOK_TOKEN_FILE - a file holding the same secret as the bot's HOOK_TOKEN
+    HOOK_TOKEN  - the secret itself, e.g. from qBittorrent's service environment
+    HOOK_INSTANCE - the bot's name for this qBittorrent, with QBIT_INSTANCES
+
+Only the standard library is used, and the call gives up after a few seconds
+so a stopped bot never holds qBittorrent up. Keep the token out of the command
+line: qBittorrent writes that to its execution log, and `ps` shows it.
+"""
+
+import argparse
+import os
+import sys
+import urllib.error
+import urllib.parse
+import urllib.request
+
+DEFAULT_URL = 'http://127.0.0.1:8765/hook'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('event', choices=['added', 'finished'])
+    parser.add_argument('hash', help="torrent ID (%%K) or info hash (%%I)")
+    parser.add_argument('--url', default=os.getenv('HOOK_URL', DEFAULT_URL))
+    parser.add_argument('--token-file', default=os.getenv('HOOK_TOKEN_FILE', ''),
+                        help="file holding the shared secret (preferred)")
+    parser.add_argument('--token', default=os.getenv('HOOK_TOKEN', ''),
+                        help="the shared secret; visible in ps and qBittorrent's log, so prefer --token-file")
+    parser.add_argument('--instance', default=os.getenv('HOOK_INSTANCE', ''))
+    parser.add_argument('--timeout', type=float, default=3.0)
+    args = parser.parse_args()
+
+    token = args.token
+    if args.token_file:
+        try:
+            with open(args.token_file, encoding='utf-8') as f:
+                token = f.read().strip()
+        except OSError as e:
+            print(f"qbit_hook: could not read the token file: {e}", file=sys.stderr)
+            return 1
+    if not token:
+        print("qbit_hook: no token; set HOOK_TOKEN_FILE or HOOK_TOKEN", file=sys.stderr)
+        return 1
+
+    fields = {'event': args.event, 'hash': args.hash}
+    if args.instance:
+        fields['instance'] = args.instance
+    request = urllib.request.Request(
+        args.url,
+        data=urllib.parse.urlencode(fields).encode(),
+        headers={'X-Hook-Token': token},
+        method='POST'
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=args.timeout):
+            pass
+    except urllib.error.HTTPError as e:
+        print(f"qbit_hook: the bot refused the ping: {e.code} {e.reason}", file=sys.stderr)
+        return 1
+    except (urllib.error.URLError, OSError) as e:
+        print(f"qbit_hook: could not reach the bot at {args.url}: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import qbit_bot
+
+
+class FakeQbitClient:
+    """Stand-in AsyncQbitClient: records calls and answers from canned responses
+
+    A response is either a value or a function of the call's keyword arguments.
+    """
+    timeout = 5
+
+    def __init__(self, **responses):
+        self.responses = responses
+        self.calls = []
+
+    async def call(self, method, *args, **kwargs):
+        self.calls.append((method, kwargs))
+        response = self.responses[method]
+        return response(kwargs) if callable(response) else response
+
+    def methods(self):
+        return [method for method, _ in self.calls]
+
+    def close(self):
+        pass
+
+
+def torrent(torrent_hash, **fields):
+    """A torrents_info entry with harmless defaults"""
+    data = {'hash': torrent_hash, 'name': f"Torrent {torrent_hash}", 'category': 'radarr', 'progress': 1.0,
+            'state': 'uploading', 'eta': 8640000, 'size': 2**30, 'dlspeed': 0}
+    data.update(fields)
+    return data
+
+
+def record(torrent_hash, instance='default', **fields):
+    """A TorrentRecord built the way TorrentManager builds them"""
+    manager = qbit_bot.TorrentManager(FakeQbitClient(), instance)
+    return manager._update_record(qbit_bot.TorrentRecord(torrent_hash, instance), torrent(torrent_hash, **fields))
+
+
+def make_bot(monkeypatch, **env):
+    """A DiscordBot against one fake backend, with every optional feature not in `env` off"""
+    settings = {
+        'BOT_CHANNEL': '1',
+        'QBIT_INSTANCES': '',
+        'QBIT_HOST': '127.0.0.1',
+        'QBIT_PORT': '8080',
+        'NOTIFY_CHANNELS': '',
+        'STATS_DB': '',
+        'STATE_FILE': '',
+        'METRICS_PORT': '',
+        'HOOK_PORT': '',
+        'HOOK_TOKEN': '',
+    }
+    settings.update(env)
+    for name, value in settings.items():
+        monkeypatch.setenv(name, value)
+    return qbit_bot.DiscordBot()
+
+
+@pytest.fixture
+def bot(monkeypatch):
+    return make_bot(monkeypatch)
@@ -0,0 +1,26 @@
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'bench'))
+
+import run_bench
+
+
+def test_bench_runs_and_steady_refreshes_cost_little(monkeypatch):
+    # run_bench points the bot at its fake server through the environment
+    for name in ('BOT_CHANNEL', 'QBIT_INSTANCES', 'QBIT_HOST', 'QBIT_PORT', 'QBIT_USERNAME', 'QBIT_PASSWORD',
+                 'NOTIFY_CHANNELS', 'STATS_DB', 'STATE_FILE'):
+        monkeypatch.setenv(name, os.environ.get(name, ''))
+    args = argparse.Namespace(cycles=3, churn=5, adds=1, removes=1, category='all', status='all',
+                              latency=0.0, pace=False, seed=0)
+
+    cycles = asyncio.run(run_bench.run_size(200, args))
+
+    cold, steady = cycles[0], cycles[1:]
+    assert cold['calls'] == 1  # The first status message
+    assert all(cycle['calls'] <= 1 for cycle in steady)
+    # Deltas, not the whole library, after the first fetch
+    assert all(cycle['bytes'] < cold['bytes'] / 5 for cycle in steady)
+    assert all(cycle['rows'] == 200 for cycle in cycles)
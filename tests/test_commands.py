@@ -0,0 +1,119 @@
+import asyncio
+
+import qbit_bot
+from conftest import record
+
+
+def test_status_args(bot):
+    parse = bot._parse_status_args
+    assert parse(()) == ("list", "all", "all")
+    assert parse(("tv", "stalled")) == ("list", "tv", "stalled")
+    assert parse(("summary", "movies")) == ("summary", "movies", "all")
+    assert parse(("completed",)) == ("list", "all", "completed")
+    # A category the bot hasn't seen yet, alone or followed by a status
+    assert parse(("music",)) == ("list", "music", "all")
+    assert parse(("music", "downloading")) == ("list", "music", "downloading")
+
+
+def test_status_args_with_leftover_words_are_refused(bot):
+    parse = bot._parse_status_args
+    assert parse(("downloading", "foo")) is None
+    assert parse(("tv", "stalld")) is None
+    assert parse(("music", "new", "stuff")) is None
+    assert parse(("all", "foo")) is None
+
+
+class Ctx:
+    def __init__(self, bot):
+        permissions = type('Permissions', (), {'manage_guild': True})()
+        self.author = type('User', (), {'name': 'someone', 'discriminator': '0', 'id': 7,
+                                        'guild_permissions': permissions})()
+        self.guild = type('Guild', (), {'name': 'guild', 'id': 3})()
+        self.channel = type('Channel', (), {'name': 'downloads', 'id': 1})()
+
+
+def test_bare_delete_is_refused_before_selecting_anything(bot):
+    sent = []
+    selected = []
+
+    async def send(channel, priority=None, **kwargs):
+        sent.append(kwargs['content'])
+
+    async def select(args):
+        selected.append(args)
+        return []
+    bot.outbox.send = send
+    bot._select_torrents = select
+
+    asyncio.run(bot.get_command('delete').callback(Ctx(bot), '--files'))
+
+    assert selected == []
+    assert sent and "Say which torrents to delete" in sent[0]
+
+
+def control_bot(bot, torrents, confirm=True):
+    """Stub out selection, sending and qBittorrent; return what was sent, prompted and applied"""
+    sent, prompts, applied = [], [], []
+
+    async def send(channel, priority=None, **kwargs):
+        sent.append(kwargs)
+        if 'view' in kwargs:
+            prompts.append(kwargs['view'].confirm.label)
+            kwargs['view'].confirmed = confirm
+            kwargs['view'].stop()
+        return object()
+
+    async def edit(message, priority=None, **kwargs):
+        sent.append(kwargs)
+
+    async def select(args):
+        return torrents
+
+    async def apply(method, selected, **params):
+        applied.append((method, len(selected), params))
+        return {}
+    bot.outbox.send = send
+    bot.outbox.edit = edit
+    bot._select_torrents = select
+    bot.torrent_manager.apply = apply
+    bot._refresh_soon = lambda: None
+    return sent, prompts, applied
+
+
+def test_bare_control_commands_are_refused(bot):
+    sent, prompts, applied = control_bot(bot, [record('a'), record('b')])
+
+    async def run():
+        for name in ('pause', 'resume', 'recheck'):
+            await bot.get_command(name).callback(Ctx(bot))
+        await bot.get_command('setcategory').callback(Ctx(bot), 'movies')
+    asyncio.run(run())
+
+    assert applied == []
+    assert [kwargs['content'].split(',')[0] for kwargs in sent] == [
+        "❌ Say which torrents to pause", "❌ Say which torrents to resume",
+        "❌ Say which torrents to recheck", "❌ Say which torrents to move"]
+
+
+def test_all_opts_in_to_every_torrent(bot):
+    sent, prompts, applied = control_bot(bot, [record('a'), record('b')])
+    asyncio.run(bot.get_command('pause').callback(Ctx(bot), 'all'))
+    assert prompts == [] and applied == [('torrents_pause', 2, {})]
+
+
+def test_bulk_recheck_and_setcategory_ask_first(bot):
+    sent, prompts, applied = control_bot(bot, [record('a'), record('b')], confirm=False)
+
+    async def run():
+        await bot.get_command('recheck').callback(Ctx(bot), 'all')
+        await bot.get_command('setcategory').callback(Ctx(bot), 'movies', 'tv')
+    asyncio.run(run())
+
+    assert prompts == ["Recheck 2", "Move 2"]
+    assert applied == []
+
+
+def test_single_recheck_needs_no_confirmation(bot):
+    sent, prompts, applied = control_bot(bot, [record('a')])
+    asyncio.run(bot.get_command('recheck').callback(Ctx(bot), 'matrix'))
+    assert prompts == [] and applied == [('torrents_recheck', 1, {})]
@@ -0,0 +1,81 @@
+import asyncio
+
+import qbit_bot
+from conftest import FakeQbitClient, record, torrent
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(qbit_bot.time, 'monotonic', lambda: now[0])
+    cache = qbit_bot.TtlCache(max_weight=10, ttl=60)
+    cache.put('a', "A", weight=3)
+
+    now[0] = 159.0
+    assert cache.get('a') == "A"
+    now[0] = 160.0
+    assert cache.get('a') is None
+    assert cache.weight == 0
+
+
+def test_ttl_cache_evicts_by_weight_least_recent_first():
+    cache = qbit_bot.TtlCache(max_weight=10, ttl=60)
+    cache.put('a', "A", weight=4)
+    cache.put('b', "B", weight=4)
+    cache.get('a')
+    cache.put('c', "C", weight=4)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == "A" and cache.get('c') == "C"
+    assert cache.weight == 8
+
+
+def test_ttl_cache_skips_entries_heavier_than_the_whole_cache():
+    cache = qbit_bot.TtlCache(max_weight=10, ttl=60)
+    cache.put('a', "A", weight=4)
+    cache.put('a', "huge", weight=11)
+    assert cache.get('a') is None and cache.weight == 0
+
+
+def live_bot(bot, *hashes):
+    table = {h: torrent(h, name=f"Name {h[:4]}") for h in hashes}
+    client = FakeQbitClient(sync_maindata={'rid': 1, 'full_update': True, 'torrents': table})
+    next(iter(bot.torrent_manager.managers.values())).client = client
+    return bot
+
+
+def test_ambiguous_hash_prefix_returns_candidates(bot):
+    live_bot(bot, 'abcdef01' + '0' * 32, 'abcdef02' + '0' * 32, '12345678' + '0' * 32)
+
+    torrent, total, candidates = asyncio.run(bot._resolve_torrent('abcdef'))
+    assert torrent is None and total == 2
+    assert [c.hash[:8] for c in candidates] == ['abcdef01', 'abcdef02']
+
+    torrent, total, candidates = asyncio.run(bot._resolve_torrent('abcdef02'))
+    assert torrent.hash.startswith('abcdef02') and total == 1 and candidates == []
+
+
+def test_failed_details_page_sends_an_ephemeral_followup(bot):
+    sent = []
+
+    class Followup:
+        async def send(self, content, ephemeral=False):
+            sent.append((content, ephemeral))
+
+    class Response:
+        async def defer(self):
+            pass
+
+    interaction = type('Interaction', (), {'response': Response(), 'followup': Followup(), 'message': None})()
+
+    async def broken(torrent, page):
+        raise RuntimeError("backend down")
+
+    async def run():
+        bot._render_details = broken
+        view = qbit_bot.DetailsView(bot, record('a' * 40))
+        await bot._turn_details_page(interaction, view, 1)
+        return view
+
+    view = asyncio.run(run())
+    assert sent == [("❌ Couldn't load that page: backend down", True)]
+    assert view.page == 0
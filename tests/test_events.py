@@ -0,0 +1,53 @@
+import asyncio
+import logging
+
+import qbit_bot
+from conftest import record
+
+
+def make_engine(delivered, debounce=60):
+    engine = qbit_bot.TorrentEventEngine(None, {'1'}, set(qbit_bot.TorrentEvent.KINDS), debounce=debounce)
+
+    async def deliver(events):
+        delivered.append(events)
+    engine.deliver = deliver
+    return engine
+
+
+def added(*hashes):
+    delta = qbit_bot.TorrentDelta(initial=False)
+    delta.added.extend(record(h) for h in hashes)
+    return delta
+
+
+def test_flush_delivers_the_pending_batch_at_once():
+    delivered = []
+
+    async def run():
+        engine = make_engine(delivered)
+        engine.handle(None, added('a', 'b'))
+        await engine.flush()
+        await asyncio.sleep(0)
+        return engine
+
+    engine = asyncio.run(run())
+    assert [[e.record.hash for e in batch] for batch in delivered] == [['a', 'b']]
+    assert engine.pending == [] and engine.flush_task is None
+
+
+def test_cancelled_batch_is_logged(caplog):
+    delivered = []
+
+    async def run():
+        engine = make_engine(delivered)
+        engine.handle(None, added('a'))
+        await asyncio.sleep(0)  # Let the batch start waiting
+        engine.flush_task.cancel()
+        await asyncio.sleep(0)
+        return engine
+
+    with caplog.at_level(logging.WARNING, logger='qbit_bot'):
+        engine = asyncio.run(run())
+    assert delivered == []
+    assert engine.pending == []
+    assert "Discarded 1 pending notifications" in caplog.text
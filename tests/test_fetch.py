@@ -0,0 +1,41 @@
+import asyncio
+
+import qbit_bot
+from conftest import FakeQbitClient, torrent
+
+
+def test_filtered_view_without_listeners_is_filtered_by_the_server(bot):
+    client = FakeQbitClient(torrents_info=[torrent('a' * 40)])
+    manager = next(iter(bot.torrent_manager.managers.values()))
+    manager.client = client
+    key = ("radarr", qbit_bot.Config.COMPLETE_STATUS)
+
+    # Default configuration: nothing listens to sync deltas
+    assert manager.listeners == []
+    snapshots = asyncio.run(bot.torrent_manager.get_snapshots({key}))
+
+    assert client.methods() == ['torrents_info']
+    assert client.calls[0][1]['category'] == 'radarr'
+    assert client.calls[0][1]['status_filter'] == 'completed'
+    assert [t.hash for t in snapshots[key]] == ['a' * 40]
+
+
+def test_stalled_and_hashes_are_pushed_down():
+    client = FakeQbitClient(torrents_info=[])
+    manager = qbit_bot.TorrentManager(client)
+
+    asyncio.run(manager.fetch(status_filter=qbit_bot.Config.STALLED_STATUS, hashes=['b' * 40]))
+
+    assert client.methods() == ['torrents_info']
+    assert client.calls[0][1]['status_filter'] == 'stalled_downloading'
+    assert client.calls[0][1]['torrent_hashes'] == ['b' * 40]
+
+
+def test_listener_switches_to_sync():
+    client = FakeQbitClient(sync_maindata={'rid': 1, 'full_update': True, 'torrents': {}})
+    manager = qbit_bot.TorrentManager(client)
+    manager.listeners.append(lambda manager, delta: None)
+
+    asyncio.run(manager.fetch("radarr", qbit_bot.Config.COMPLETE_STATUS))
+
+    assert client.methods() == ['sync_maindata']
@@ -0,0 +1,110 @@
+import asyncio
+
+from aiohttp.test_utils import TestClient, TestServer
+
+import qbit_bot
+from conftest import FakeQbitClient, make_bot, record, torrent
+
+HASH = 'a' * 40
+
+
+def hook_bot(monkeypatch):
+    return make_bot(monkeypatch, HOOK_PORT='8765', HOOK_TOKEN='s3cret', HOOK_DEBOUNCE='60')
+
+
+def post(bot, *requests):
+    """Send each (headers, form data) request to the hook endpoint; returns their statuses"""
+    async def run():
+        server = next(iter(bot.http_servers.values()))
+        statuses = []
+        async with TestClient(TestServer(server.app)) as client:
+            for headers, data in requests:
+                response = await client.post('/hook', data=data, headers=headers)
+                statuses.append(response.status)
+        if bot.hook_task:
+            bot.hook_task.cancel()
+        return statuses
+    return asyncio.run(run())
+
+
+TOKEN = {'X-Hook-Token': 's3cret'}
+
+
+def test_hook_needs_a_token(monkeypatch):
+    bot = make_bot(monkeypatch, HOOK_PORT='8765', HOOK_TOKEN='')
+    assert not bot.hook_enabled and bot.http_servers == {}
+
+
+def test_ping_with_the_token_header_is_queued(monkeypatch):
+    bot = hook_bot(monkeypatch)
+    assert post(bot, (TOKEN, {'hash': HASH.upper(), 'event': 'finished'})) == [202]
+    assert bot.hook_hashes == {(None, HASH)}
+
+
+def test_wrong_or_missing_token_is_rejected(monkeypatch):
+    bot = hook_bot(monkeypatch)
+    assert post(bot, ({'X-Hook-Token': 'nope'}, {'hash': HASH}), ({}, {'hash': HASH})) == [401, 401]
+    assert bot.hook_hashes == set()
+
+
+def test_token_outside_the_header_is_not_accepted(monkeypatch):
+    bot = hook_bot(monkeypatch)
+    assert post(bot, ({}, {'hash': HASH, 'token': 's3cret'})) == [401]
+
+
+def test_bad_hashes_and_instances_are_rejected(monkeypatch):
+    bot = hook_bot(monkeypatch)
+    assert post(bot,
+                (TOKEN, {}),
+                (TOKEN, {'hash': 'not-a-hash'}),
+                (TOKEN, {'hash': HASH, 'instance': 'elsewhere'})) == [400, 400, 400]
+    assert bot.hook_hashes == set()
+
+
+def test_pushed_scheduler_skips_the_backoff_ramp():
+    scheduler = qbit_bot.RefreshScheduler(300, 30, 1800, pushed=True)
+    assert scheduler.next_interval(active=False, changed=False) == 1800
+    assert scheduler.next_interval(active=False, changed=True) == 300
+    assert scheduler.next_interval(active=True, changed=False) == 30
+
+
+def test_patch_rows_swaps_in_fresh_records(bot):
+    view = qbit_bot.StatusView(type('Channel', (), {'id': 1})(), 'all', qbit_bot.Config.DOWNLOADING_STATUS)
+    old = record('a' * 40, state='downloading', progress=0.5)
+    other = record('b' * 40, state='downloading', progress=0.2)
+    view.rows = [old, other]
+
+    finished = record('a' * 40, state='uploading', progress=1.0)
+    added = record('c' * 40, state='metaDL', progress=0.0)
+    assert bot._patch_rows(view, [finished, added])
+    # The finished torrent leaves the downloading view, the new one joins
+    assert view.rows == [other, added]
+
+    elsewhere = record('d' * 40, state='uploading')
+    assert not bot._patch_rows(view, [elsewhere])
+
+
+def test_hook_refresh_fetches_only_the_pinged_hashes(monkeypatch):
+    bot = hook_bot(monkeypatch)
+    client = FakeQbitClient(torrents_info=lambda kwargs: [torrent(h, state='downloading', progress=0.1)
+                                                         for h in kwargs['torrent_hashes']])
+    next(iter(bot.torrent_manager.managers.values())).client = client
+    view = qbit_bot.StatusView(type('Channel', (), {'id': 1})())
+    bot.status_views[view.key] = view
+    updated = []
+
+    async def update(view, background=True):
+        updated.append(view)
+    bot._update_status_message = update
+
+    async def run():
+        bot.next_refresh_due = asyncio.get_running_loop().time() + 1000
+        await bot._apply_hook_pings({(None, HASH)})
+        return bot.next_refresh_due - asyncio.get_running_loop().time()
+
+    due_in = asyncio.run(run())
+    assert client.methods() == ['torrents_info']
+    assert client.calls[0][1]['torrent_hashes'] == [HASH]
+    assert [t.hash for t in view.rows] == [HASH] and updated == [view]
+    # A new download pulls the regular refresh forward
+    assert due_in <= 30
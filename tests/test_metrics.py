@@ -0,0 +1,58 @@
+import qbit_bot
+
+
+def make_metrics():
+    metrics = qbit_bot.Metrics(enabled=True)
+    metrics.inc('discord_calls_total', kind='send')
+    metrics.inc('discord_calls_total', kind='edit', value=2)
+    metrics.set('snapshot_torrents', 42)
+    metrics.gauge_function('outbox_queue_depth', lambda: 3)
+    metrics.observe('refresh_seconds', 0.003, background=True)
+    metrics.observe('refresh_seconds', 100, background=True)
+    return metrics
+
+
+def test_every_family_is_typed_once_before_its_series():
+    lines = make_metrics().render().splitlines()
+
+    types = [line for line in lines if line.startswith('# TYPE')]
+    assert types == [
+        '# TYPE qbitbot_discord_calls_total counter',
+        '# TYPE qbitbot_outbox_queue_depth gauge',
+        '# TYPE qbitbot_snapshot_torrents gauge',
+        '# TYPE qbitbot_refresh_seconds histogram',
+    ]
+    for type_line in types:
+        name = type_line.split()[2]
+        first_series = next(i for i, line in enumerate(lines) if line.startswith(name) and not line.startswith('#'))
+        assert lines.index(type_line) < first_series
+
+
+def test_histograms_are_cumulative_with_sum_and_count():
+    text = make_metrics().render()
+
+    assert 'qbitbot_refresh_seconds_bucket{background="True",le="0.005"} 1' in text
+    assert 'qbitbot_refresh_seconds_bucket{background="True",le="30"} 1' in text
+    assert 'qbitbot_refresh_seconds_bucket{background="True",le="+Inf"} 2' in text
+    assert 'qbitbot_refresh_seconds_count{background="True"} 2' in text
+    assert 'qbitbot_refresh_seconds_sum{background="True"} 100.003' in text
+    assert 'qbitbot_discord_calls_total{kind="edit"} 2' in text
+
+
+def test_failing_gauge_function_is_left_out():
+    metrics = qbit_bot.Metrics(enabled=True)
+    metrics.gauge_function('broken', lambda: 1 / 0)
+    assert metrics.render() == "\n"
+
+
+def test_label_values_are_escaped():
+    metrics = qbit_bot.Metrics(enabled=True)
+    metrics.inc('errors_total', error='say "hi"\nback\\slash')
+    assert 'error="say \\"hi\\"\\nback\\\\slash"' in metrics.render()
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = qbit_bot.Metrics()
+    metrics.inc('calls_total')
+    metrics.observe('refresh_seconds', 1)
+    assert metrics.counters == {} and metrics.histograms == {}
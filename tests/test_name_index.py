@@ -0,0 +1,121 @@
+import asyncio
+
+import qbit_bot
+from conftest import FakeQbitClient, record, torrent
+
+
+def make_index(*names):
+    index = qbit_bot.NameIndex()
+    records = [record(f"{i:040x}", name=name) for i, name in enumerate(names)]
+    index.rebuild(records)
+    return index, records
+
+
+def names(results):
+    return [r.name for r in results[0]]
+
+
+def test_every_term_must_match():
+    index, _ = make_index("The.Office.S03.1080p", "The.Matrix.1999", "Office.Space.1999")
+    assert names(index.search("office 1999")) == ["Office.Space.1999"]
+    assert index.search("office matrix") == ([], 0)
+
+
+def test_exact_words_rank_above_prefixes_and_substrings():
+    index, _ = make_index("Hypersuper.Kart", "Superman.Returns", "Super.Mario.Bros")
+    assert names(index.search("super")) == ["Super.Mario.Bros", "Superman.Returns", "Hypersuper.Kart"]
+    # Substrings inside a word match too
+    assert names(index.search("perma")) == ["Superman.Returns"]
+
+
+def test_limit_and_total():
+    index, _ = make_index(*(f"Show.S01E{i:02}" for i in range(12)))
+    results, total = index.search("show", limit=5)
+    assert len(results) == 5 and total == 12
+
+
+def test_predicate_filters_matches():
+    index, records = make_index("Matrix.Movie", "Matrix.Show")
+    results, total = index.search("matrix", predicate=lambda r: r is records[1])
+    assert results == [records[1]] and total == 1
+
+
+def test_handle_follows_deltas():
+    index, (keep, gone) = make_index("Alpha.Release", "Beta.Release")
+    added = record('f' * 40, name="Gamma.Release")
+    delta = qbit_bot.TorrentDelta(initial=False)
+    delta.added.append(added)
+    delta.removed.append(gone)
+    keep.name = "Delta.Release"
+    delta.renamed.append((keep, "Alpha.Release"))
+
+    index.handle(None, delta)
+
+    assert names(index.search("release")) == ["Delta.Release", "Gamma.Release"]
+    assert index.search("alpha") == ([], 0)
+    # Words nobody uses any more leave the vocabulary and its trigrams
+    assert "beta" not in index.postings and "alpha" not in index.postings
+    assert not any("alpha" in words for words in index.trigrams.values())
+
+
+def test_short_terms():
+    index, _ = make_index("A.Bc.Def", "Xy.Z")
+    assert names(index.search("a")) == ["A.Bc.Def"]
+    assert names(index.search("bc")) == ["A.Bc.Def"]
+
+
+def test_concurrent_finds_wait_for_the_whole_index(bot):
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def sync_maindata(kwargs):
+        started.set()
+        await release.wait()
+        return {'rid': 1, 'full_update': True, 'torrents': {'a' * 40: torrent('a' * 40, name="Matrix")}}
+
+    class SlowClient(FakeQbitClient):
+        async def call(self, method, *args, **kwargs):
+            self.calls.append((method, kwargs))
+            return await sync_maindata(kwargs)
+
+    manager = next(iter(bot.torrent_manager.managers.values()))
+    manager.client = SlowClient()
+
+    async def run():
+        first = asyncio.ensure_future(bot._ensure_index())
+        await started.wait()
+        second = asyncio.ensure_future(bot._ensure_index())
+        await asyncio.sleep(0)
+        # Nothing is published while the build is still fetching
+        assert bot.name_index is None
+        release.set()
+        return await first, await second
+
+    first, second = asyncio.run(run())
+    assert first is second
+    assert names(first.search("matrix")) == ["Matrix"]
+    assert len(manager.listeners) == 1
+
+
+def test_parse_filters(bot):
+    manager = next(iter(bot.torrent_manager.managers.values()))
+    manager.torrents['a'] = record('a', category='music')
+
+    assert bot._parse_filters(["movies", "completed", "matrix"]) == ("movies", "completed", ["matrix"])
+    assert bot._parse_filters(["Music", "office"]) == ("Music", "all", ["office"])
+    assert bot._parse_filters(["stalled"]) == ("all", "stalled", [])
+    assert bot._parse_filters(["office", "stalled"]) == ("all", "all", ["office", "stalled"])
+    assert bot._parse_filters([]) == ("all", "all", [])
+
+
+def test_find_embed_shows_every_match_that_fits(bot):
+    index, _ = make_index(*(f"Long.Show.{'x' * 90}.S01E{i:02}" for i in range(10)))
+    embed = bot._find_embed(index, "show", "all", "all")
+    assert embed.description.count("Long.Show.") == 10
+    assert embed.footer.text.startswith("Showing 10 of 10 matches")
+
+    index, _ = make_index(*(f"Huge.Show.{'x' * 800}.S01E{i:02}" for i in range(10)))
+    embed = bot._find_embed(index, "show", "all", "all")
+    shown = embed.description.count("Huge.Show.")
+    assert 0 < shown < 10 and len(embed.description) <= 4096
+    assert embed.footer.text.startswith(f"Showing {shown} of 10 matches")
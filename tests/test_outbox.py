@@ -0,0 +1,58 @@
+import asyncio
+
+import discord
+import pytest
+
+import qbit_bot
+
+
+class SlowChannel:
+    id = 1
+
+    def __init__(self, error=None):
+        self.error = error
+        self.started = asyncio.Event()
+
+    async def send(self, **kwargs):
+        self.started.set()
+        if self.error:
+            raise self.error
+        await asyncio.sleep(3600)
+
+
+def test_close_cancels_calls_in_flight_and_queued():
+    async def run():
+        outbox = qbit_bot.DiscordOutbox()
+        channel = SlowChannel()
+        running = asyncio.ensure_future(outbox.send(channel, content="first"))
+        await channel.started.wait()
+        assert len(outbox.in_flight) == 1
+
+        outbox.close()
+        with pytest.raises(asyncio.CancelledError):
+            await running
+        await asyncio.sleep(0)
+        assert outbox.in_flight == set()
+
+    asyncio.run(run())
+
+
+def test_rate_limit_that_escapes_discord_py_empties_the_bucket():
+    async def run():
+        outbox = qbit_bot.DiscordOutbox()
+        channel = SlowChannel(error=discord.RateLimited(4.0))
+        with pytest.raises(discord.RateLimited):
+            await outbox.send(channel, content="hi")
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        assert outbox.rate_limited == 1
+        assert outbox._ready_at(('send', channel.id), now) >= now + 3.9
+        outbox.close()
+
+    asyncio.run(run())
+
+
+def test_only_rate_limits_carry_a_retry_after():
+    assert qbit_bot.DiscordOutbox._retry_after(ValueError()) is None
+    assert qbit_bot.DiscordOutbox._retry_after(discord.RateLimited(2.5)) == 2.5
@@ -0,0 +1,53 @@
+import http.server
+import os
+import subprocess
+import sys
+import threading
+
+HOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'qbit_hook.py')
+
+
+def run_hook(*args, **env):
+    environment = {k: v for k, v in os.environ.items() if not k.startswith('HOOK_')}
+    environment.update(env)
+    return subprocess.run([sys.executable, HOOK, *args], capture_output=True, text=True, env=environment, timeout=30)
+
+
+def test_refuses_to_run_without_a_token():
+    result = run_hook('added', 'a' * 40)
+    assert result.returncode == 1 and "no token" in result.stderr
+
+
+def test_unreadable_token_file_is_reported(tmp_path):
+    result = run_hook('added', 'a' * 40, '--token-file', str(tmp_path / 'missing'))
+    assert result.returncode == 1 and "token file" in result.stderr
+
+
+def test_token_file_is_sent_as_the_header(tmp_path):
+    received = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+            received.append((self.headers['X-Hook-Token'], body))
+            self.send_response(202)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.handle_request)
+    thread.start()
+    token_file = tmp_path / 'hook_token'
+    token_file.write_text("s3cret\n")
+
+    result = run_hook('finished', 'a' * 40, '--token-file', str(token_file),
+                      '--url', f"http://127.0.0.1:{server.server_port}/hook")
+    thread.join(10)
+    server.server_close()
+
+    assert result.returncode == 0, result.stderr
+    token, body = received[0]
+    assert token == 's3cret'
+    assert 's3cret' not in body and 'event=finished' in body
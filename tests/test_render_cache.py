@@ -0,0 +1,52 @@
+import random
+
+import qbit_bot
+from conftest import record
+
+TM = qbit_bot.TorrentManager
+
+
+def test_eta_bucket_matches_exactly_the_etas_rendered_alike():
+    rng = random.Random(0)
+    etas = list(range(0, 4000)) + [rng.randrange(0, 10 * 604800) for _ in range(20000)]
+    etas += [604800, 604800 + 86399, 604800 + 86400, 86400 * 3 + 59, 3600 * 5 + 61]
+    buckets = {}
+    for eta in etas:
+        buckets.setdefault(TM._eta_bucket(eta), set()).add(TM._format_eta(eta))
+    # Each bucket renders one text...
+    assert all(len(texts) == 1 for texts in buckets.values())
+    # ...and each text comes from one bucket
+    texts = [next(iter(t)) for t in buckets.values()]
+    assert len(texts) == len(set(texts))
+
+
+def test_render_cache_reuses_text_while_the_fingerprint_matches():
+    cache = qbit_bot.RenderCache(10)
+    cache.put('a', (1, 2), "row a")
+    assert cache.get('a', (1, 2)) == "row a"
+    assert cache.get('a', (1, 3)) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.hit_rate == 0.5
+
+
+def test_render_cache_evicts_the_least_recently_used():
+    cache = qbit_bot.RenderCache(2)
+    cache.put('a', 1, "a")
+    cache.put('b', 1, "b")
+    cache.get('a', 1)
+    cache.put('c', 1, "c")
+    assert list(cache.entries) == ['a', 'c']
+
+
+def test_rows_are_rerendered_only_when_visible_fields_change(bot):
+    torrent = record('a' * 40, state='downloading', progress=0.5, eta=7260, dlspeed=1000)
+    first = bot._format_for_discord([torrent])
+
+    # Both read "2 hours, 1 minute"
+    torrent.eta = 7290
+    assert bot._format_for_discord([torrent]) == first
+    assert bot.render_cache.hits == 1
+
+    torrent.progress = 0.6
+    second = bot._format_for_discord([torrent])
+    assert second != first and "60.0%" in second[0]
@@ -0,0 +1,29 @@
+import qbit_bot
+
+
+def make_scheduler(**kwargs):
+    return qbit_bot.RefreshScheduler(300, 30, 1800, **kwargs)
+
+
+def test_active_downloads_poll_at_the_minimum():
+    scheduler = make_scheduler()
+    assert scheduler.next_interval(active=True, changed=False) == 30
+    assert scheduler.next_interval(active=True, changed=True) == 30
+
+
+def test_changes_return_to_the_base_interval():
+    scheduler = make_scheduler()
+    scheduler.next_interval(active=True, changed=True)
+    assert scheduler.next_interval(active=False, changed=True) == 300
+
+
+def test_idle_library_backs_off_up_to_the_maximum():
+    scheduler = make_scheduler()
+    intervals = [scheduler.next_interval(active=False, changed=False) for _ in range(4)]
+    assert intervals == [600, 1200, 1800, 1800]
+
+
+def test_backoff_starts_from_the_minimum():
+    scheduler = make_scheduler()
+    scheduler.interval = 0
+    assert scheduler.next_interval(active=False, changed=False) == 60
@@ -0,0 +1,63 @@
+import asyncio
+
+from conftest import make_bot
+
+
+def count_syncs(bot):
+    syncs = []
+
+    async def sync():
+        syncs.append(True)
+    bot.tree.sync = sync
+    return syncs
+
+
+def test_commands_sync_once_then_only_when_they_change(monkeypatch, tmp_path):
+    bot = make_bot(monkeypatch, STATE_FILE=str(tmp_path / 'state.json'))
+    syncs = count_syncs(bot)
+
+    asyncio.run(bot._sync_commands())
+    asyncio.run(bot._sync_commands())
+    assert len(syncs) == 1
+    assert bot._state_snapshot()['commands_digest'] == bot._commands_digest()
+
+    bot.commands_digest = 'from an older version'
+    asyncio.run(bot._sync_commands())
+    assert len(syncs) == 2
+
+
+def test_without_a_state_file_commands_sync_only_on_request(monkeypatch):
+    syncs = count_syncs(bot := make_bot(monkeypatch))
+    asyncio.run(bot._sync_commands())
+    assert syncs == []
+
+    syncs = count_syncs(bot := make_bot(monkeypatch, SYNC_COMMANDS='true'))
+    asyncio.run(bot._sync_commands())
+    asyncio.run(bot._sync_commands())
+    assert len(syncs) == 2
+
+
+def test_slash_commands_are_registered(bot):
+    assert {command.name for command in bot.tree.get_commands()} == {'status', 'find'}
+
+
+def test_autocomplete_answers_from_memory(bot):
+    manager = next(iter(bot.torrent_manager.managers.values()))
+    manager.client = None  # Any backend call would fail
+
+    async def run():
+        return (await bot._complete_status(None, 'st'), await bot._complete_category(None, 'tv'),
+                await bot._complete_name(None, 'matrix'))
+
+    statuses, categories, names = asyncio.run(run())
+    assert [c.value for c in statuses] == ['stalled']
+    assert [c.value for c in categories] == ['tv', 'tv-sonarr']
+    assert names == []
+
+
+def test_digest_follows_command_definitions(bot):
+    before = bot._commands_digest()
+    assert before == bot._commands_digest()
+
+    bot.tree.get_command('find').description = "Something else"
+    assert bot._commands_digest() != before
@@ -0,0 +1,49 @@
+import asyncio
+
+import qbit_bot
+
+
+class Channel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+
+    def get_partial_message(self, message_id):
+        return type('PartialMessage', (), {'id': message_id, 'channel': self})()
+
+
+def test_restored_views_route_every_control(bot):
+    registered = []
+    channel = Channel(1)
+    bot.get_channel = lambda channel_id: channel if channel_id == 1 else None
+    bot.add_view = lambda view, message_id=None: registered.append((view, message_id))
+    bot.saved_state = {'views': [
+        {'channel_id': 1, 'category': 'tv', 'status_filter': 'all', 'mode': 'list',
+         'message_id': 99, 'page': 3, 'auto_refresh': False},
+        {'channel_id': 2, 'category': 'all', 'status_filter': 'all', 'message_id': 5},
+    ]}
+
+    async def run():
+        bot._restore_views()
+
+    asyncio.run(run())
+
+    view, = bot.status_views.values()
+    assert (view.category, view.page, view.auto_refresh, view.message.id) == ('tv', 3, False, 99)
+    controls, message_id = registered[0]
+    assert message_id == 99
+    assert {item.custom_id for item in controls.children} == {
+        'qbitbot:status:previous', 'qbitbot:status:next', 'qbitbot:status:refresh',
+        'qbitbot:status:toggle', 'qbitbot:status:close', 'qbitbot:status:page',
+    }
+
+
+def test_state_snapshot_round_trips_through_restore(bot):
+    channel = Channel(1)
+    view = qbit_bot.StatusView(channel, 'movies', 'completed', 'summary')
+    view.page = 2
+    bot.status_views[view.key] = view
+
+    snapshot = bot._state_snapshot()
+
+    assert snapshot['views'] == [{'channel_id': 1, 'category': 'movies', 'status_filter': 'completed',
+                                  'mode': 'summary', 'message_id': None, 'page': 2, 'auto_refresh': True}]
@@ -0,0 +1,75 @@
+import asyncio
+
+import qbit_bot
+from conftest import FakeQbitClient, torrent
+
+
+def full(rid, *torrents):
+    return {'rid': rid, 'full_update': True, 'torrents': {t['hash']: t for t in torrents}}
+
+
+def start(path):
+    """A fresh process: an empty backend table and a store on an existing database"""
+    manager = qbit_bot.TorrentManager(FakeQbitClient())
+    federation = qbit_bot.TorrentFederation([manager])
+    store = qbit_bot.StatsStore(str(path))
+    federation.add_listener(store.handle)
+    return manager, federation, store
+
+
+def stalled(store):
+    _, rows, _ = store._summary(10**10, 3600, store.HOUR)
+    return [(name, since) for name, instance, since in rows]
+
+
+def test_restart_reconciles_stale_states(tmp_path):
+    path = tmp_path / "stats.db"
+
+    async def first_run():
+        manager, federation, store = start(path)
+        manager._apply_sync(full(1, torrent('a', name="Finished", state='stalledDL', progress=0.5),
+                                 torrent('b', name="Gone", state='stalledDL', progress=0.1),
+                                 torrent('c', name="Still", state='stalledDL', progress=0.2)))
+        await store.record(federation)
+        await store.close()
+    asyncio.run(first_run())
+    with qbit_bot.sqlite3.connect(path) as db:
+        db.execute("UPDATE torrent_states SET since = 100")
+
+    async def second_run():
+        manager, federation, store = start(path)
+        # A poll before the backend answered must not settle anything
+        await store.record(federation)
+        assert [name for name, since in stalled(store)] == ["Finished", "Gone", "Still"]
+
+        manager._apply_sync(full(1, torrent('a', name="Finished"),
+                                 torrent('c', name="Still", state='stalledDL', progress=0.3),
+                                 torrent('d', name="New", state='stalledDL', progress=0.0)))
+        await store.record(federation)
+        result = stalled(store)
+        await store.close()
+        return result
+
+    result = asyncio.run(second_run())
+    # Still stalled keeps its old `since`; finished and removed torrents are gone from the list
+    assert result[0] == ("Still", 100)
+    assert [name for name, since in result] == ["Still", "New"]
+
+
+def test_empty_first_table_still_reconciles(tmp_path):
+    path = tmp_path / "stats.db"
+
+    async def run():
+        manager, federation, store = start(path)
+        manager._apply_sync(full(1, torrent('a', state='stalledDL', progress=0.5)))
+        await store.record(federation)
+        await store.close()
+
+        manager, federation, store = start(path)
+        manager._apply_sync({'rid': 1, 'full_update': True, 'torrents': {}})
+        await store.record(federation)
+        result = stalled(store)
+        await store.close()
+        return result
+
+    assert asyncio.run(run()) == []
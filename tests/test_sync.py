@@ -0,0 +1,111 @@
+import qbit_bot
+from conftest import FakeQbitClient, torrent
+
+
+def make_manager():
+    return qbit_bot.TorrentManager(FakeQbitClient(), 'box')
+
+
+def full(rid, *torrents):
+    return {'rid': rid, 'full_update': True, 'torrents': {t['hash']: t for t in torrents}}
+
+
+def test_full_update_builds_the_table():
+    manager = make_manager()
+    manager._apply_sync(full(1, torrent('a'), torrent('b', state='downloading', progress=0.5)))
+
+    assert manager.rid == 1
+    assert set(manager.torrents) == {'a', 'b'}
+    assert manager.torrents['b'].status == qbit_bot.Status.DOWNLOADING
+    assert manager.torrents['b'].instance == 'box'
+
+
+def test_partial_changes_update_only_the_sent_fields():
+    manager = make_manager()
+    manager._apply_sync(full(1, torrent('a', state='downloading', progress=0.5, name='Old')))
+    manager._apply_sync({'rid': 2, 'torrents': {'a': {'progress': 0.75}}})
+
+    record = manager.torrents['a']
+    assert record.progress == 0.75
+    assert record.name == 'Old'
+    assert manager.rid == 2
+    assert manager.last_change_count == 1
+
+
+def test_torrents_removed_drops_records():
+    manager = make_manager()
+    manager._apply_sync(full(1, torrent('a'), torrent('b')))
+    manager._apply_sync({'rid': 2, 'torrents_removed': ['a', 'unknown']})
+
+    assert set(manager.torrents) == {'b'}
+    assert manager.last_change_count == 1
+
+
+def test_full_resync_keeps_records_and_drops_the_missing():
+    manager = make_manager()
+    manager._apply_sync(full(1, torrent('a'), torrent('b')))
+    kept = manager.torrents['a']
+
+    manager._apply_sync(full(7, torrent('a', name='Renamed')))
+
+    assert set(manager.torrents) == {'a'}
+    # Views holding the old record see the new values
+    assert manager.torrents['a'] is kept
+    assert kept.name == 'Renamed'
+
+
+def test_ballast_fields_are_dropped():
+    manager = make_manager()
+    manager._apply_sync(full(1, torrent('a', upspeed=5, tracker='https://example.org')))
+
+    assert not hasattr(manager.torrents['a'], '__dict__')
+    assert manager.torrents['a'].dlspeed == 0
+
+
+def test_delta_reports_added_removed_transitions_and_renames():
+    manager = make_manager()
+    deltas = []
+    manager.listeners.append(lambda manager, delta: deltas.append(delta))
+
+    manager._apply_sync(full(1, torrent('a', state='downloading', progress=0.5), torrent('b')))
+    manager._apply_sync({
+        'rid': 2,
+        'torrents': {'a': {'state': 'uploading', 'progress': 1.0}, 'b': {'name': 'New name'}, 'c': torrent('c')},
+        'torrents_removed': [],
+    })
+    manager._apply_sync({'rid': 3, 'torrents_removed': ['b']})
+
+    initial, changes, removal = deltas
+    assert initial.initial and {r.hash for r in initial.added} == {'a', 'b'}
+
+    assert not changes.initial
+    assert [r.hash for r in changes.added] == ['c']
+    assert [(r.hash, before) for r, before in changes.transitions] == [('a', qbit_bot.Status.DOWNLOADING)]
+    assert [(r.hash, before) for r, before in changes.renamed] == [('b', 'Torrent b')]
+
+    assert [r.hash for r in removal.removed] == ['b']
+
+
+def test_empty_delta_notifies_nobody():
+    manager = make_manager()
+    manager._apply_sync(full(1, torrent('a')))
+    deltas = []
+    manager.listeners.append(lambda manager, delta: deltas.append(delta))
+
+    manager._apply_sync({'rid': 2, 'torrents': {'a': {'dlspeed': 0}}})
+
+    assert deltas == []
+
+
+def test_full_resync_reports_only_real_changes():
+    manager = make_manager()
+    manager._apply_sync(full(1, torrent('a'), torrent('b')))
+    deltas = []
+    manager.listeners.append(lambda manager, delta: deltas.append(delta))
+
+    manager._apply_sync(full(5, torrent('a'), torrent('c')))
+
+    delta, = deltas
+    assert [r.hash for r in delta.added] == ['c']
+    assert [r.hash for r in delta.removed] == ['b']
+    assert delta.transitions == []
@@ -0,0 +1,94 @@
+import asyncio
+
+import discord
+
+import qbit_bot
+
+
+class Channel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+
+
+class Message:
+    def __init__(self, message_id, channel=None):
+        self.id = message_id
+        self.channel = channel
+
+
+def not_found():
+    return discord.NotFound(type('Response', (), {'status': 404, 'reason': 'Not Found'})(), "Unknown Message")
+
+
+def stub_outbox(bot):
+    """Record deletions; sends and edits succeed unless told otherwise"""
+    deleted = []
+
+    async def delete(message, priority=None):
+        deleted.append(message.id)
+
+    bot.outbox.delete = delete
+    return deleted
+
+
+def test_deleted_status_message_retires_the_view(bot):
+    deleted = stub_outbox(bot)
+    sent = []
+
+    async def edit(message, priority=None, **kwargs):
+        raise not_found()
+
+    async def send(channel, priority=None, **kwargs):
+        sent.append(kwargs)
+    bot.outbox.edit = edit
+    bot.outbox.send = send
+
+    view = qbit_bot.StatusView(Channel(1))
+    view.message = Message(5)
+    bot.status_views[view.key] = view
+
+    changed = asyncio.run(bot._sync_status_message(view, None, "digest", None))
+
+    assert changed is False
+    assert bot.status_views == {} and sent == [] and deleted == []
+
+
+def test_new_status_retires_the_oldest_view_in_the_channel(bot):
+    deleted = stub_outbox(bot)
+
+    async def refresh(views, background=True):
+        for view in views:
+            view.message = Message(100 + len(bot.status_views))
+    bot._request_refresh = refresh
+
+    async def run():
+        channel, elsewhere = Channel(1), Channel(2)
+        await bot._open_status(elsewhere, "all", "all", "list")
+        for category in ("movies", "tv", "music", "books"):
+            await bot._open_status(channel, category, "all", "list")
+
+    asyncio.run(run())
+
+    kept = [(key[0], key[1]) for key in bot.status_views]
+    assert kept == [(2, "all"), (1, "tv"), (1, "music"), (1, "books")]
+    assert len(deleted) == 1
+
+
+def test_close_button_retires_the_view(bot):
+    deleted = stub_outbox(bot)
+    view = qbit_bot.StatusView(Channel(1))
+    view.message = Message(5, view.channel)
+    bot.status_views[view.key] = view
+
+    class Response:
+        async def defer(self):
+            pass
+
+    interaction = type('Interaction', (), {
+        'message': view.message, 'response': Response(), 'guild': None, 'channel': view.channel,
+        'user': type('User', (), {'name': 'someone', 'discriminator': '0', 'id': 7})(),
+    })()
+
+    asyncio.run(bot._handle_control(interaction, "close"))
+
+    assert bot.status_views == {} and deleted == [5]